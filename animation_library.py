@@ -14,9 +14,650 @@ bl_info = {
     "category": "Animation",
 }
 
+import bisect
+import difflib
+import json
+import os
+import re
+from collections import OrderedDict
+
 import bpy
-from bpy.types import Panel, Operator, PropertyGroup
-from bpy.props import StringProperty, IntProperty, BoolProperty
+from bpy.app.handlers import persistent
+from bpy.types import Panel, Operator, PropertyGroup, UIList
+from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty, FloatProperty, CollectionProperty
+
+
+# ==================== ACTION INDEX ====================
+
+# Bone name addressed by a 'pose.bones["..."]' data_path
+BONE_PATH_PATTERN = re.compile(r'^pose\.bones\["((?:[^"\\]|\\.)*)"\]')
+ESCAPE_PATTERN = re.compile(r'\\(.)')
+
+# Signature per action pointer: (F-curve count, bone names, object channels)
+_signature_cache = {}
+
+# Pose bone names per armature: (pointer, bone count) -> names
+_rig_cache = {}
+
+
+def get_action_signature(action):
+    """Bone names and object-level data paths an action's F-curves address, cached per action"""
+    key = action.as_pointer()
+    cached = _signature_cache.get(key)
+    if cached is None or cached[0] != len(action.fcurves):
+        bones = set()
+        channels = set()
+        for fc in action.fcurves:
+            match = BONE_PATH_PATTERN.match(fc.data_path)
+            if match:
+                bones.add(ESCAPE_PATTERN.sub(r'\1', match.group(1)))
+            else:
+                channels.add(fc.data_path)
+        cached = _signature_cache[key] = (len(action.fcurves), frozenset(bones), frozenset(channels))
+    return cached[1], cached[2]
+
+
+def get_rig_bones(obj):
+    """Pose bone names of an object, empty for non-armatures"""
+    if obj.pose is None:
+        return frozenset()
+    key = (obj.as_pointer(), len(obj.pose.bones))
+    bones = _rig_cache.get(key)
+    if bones is None:
+        bones = _rig_cache[key] = frozenset(bone.name for bone in obj.pose.bones)
+    return bones
+
+
+def get_overlap(bones, channels, obj, rig_bones):
+    """How well an action fits an object, 0-1
+    
+    Share of the action's bones the armature has. Object-level actions
+    fit any object that isn't an armature.
+    """
+    if bones:
+        return len(bones & rig_bones) / len(bones)
+    return 1.0 if channels and obj.pose is None else 0.0
+
+
+class ActionEntry:
+    """Cached draw and search data of one action"""
+    __slots__ = ("name", "name_lower", "frame_start", "frame_end", "use_fake_user", "data_index",
+                 "bones", "channels", "tags")
+    
+    def __init__(self, action, data_index):
+        self.data_index = data_index
+        self.update(action)
+    
+    def update(self, action):
+        self.name = action.name
+        self.name_lower = action.name.lower()
+        self.frame_start = int(action.frame_range[0])
+        self.frame_end = int(action.frame_range[1])
+        self.use_fake_user = action.use_fake_user
+        self.bones, self.channels = get_action_signature(action)
+        # Asset browser tags, when the action is marked as an asset
+        asset_data = getattr(action, "asset_data", None)
+        self.tags = frozenset(tag.name for tag in asset_data.tags) if asset_data else frozenset()
+
+
+# ==================== SEARCH INDEX ====================
+
+# Words in a name: 'WalkCycle_L.001' -> walk, cycle, l, 001
+WORD_PATTERN = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+')
+
+# Field query values for range: '>100', '<=24', '=48', '24-48'
+RANGE_PATTERN = re.compile(r'^(>=|<=|>|<|=)?(\d+)(?:-(\d+))?$')
+
+# Least similarity for a fuzzy word match (difflib ratio)
+FUZZY_CUTOFF = 0.75
+
+
+def split_words(name):
+    """Lowercase words of an action name"""
+    return {word.lower() for word in WORD_PATTERN.findall(name)}
+
+
+def get_trigrams(text):
+    """Three letter slices of a lowercase text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def match_range(length, value):
+    """Whether a frame length matches a range: query value"""
+    match = RANGE_PATTERN.match(value)
+    if not match:
+        return False
+    op, low, high = match.group(1), int(match.group(2)), match.group(3)
+    if high is not None:
+        return low <= length <= int(high)
+    if op == '>':
+        return length > low
+    if op == '>=':
+        return length >= low
+    if op == '<':
+        return length < low
+    if op == '<=':
+        return length <= low
+    return length == low
+
+
+class SearchIndex:
+    """Inverted indexes over the action entries
+    
+    Query terms are separated by spaces and must all match:
+        walk        name contains 'walk' (fuzzy if nothing does)
+        walk*       a word in the name starts with 'walk'
+        ~wlak       a word in the name is close to 'wlak'
+        bone:hand_L the action keys bone hand_L (bone:hand* for a prefix)
+        tag:cycle   the action has asset tag 'cycle' (tag:cyc* for a prefix)
+        range:>100  frame length above 100 (also <, >=, <=, =, 24-48)
+    """
+    
+    def __init__(self):
+        self.entries = set()
+        self.words = {}
+        self.trigrams = {}
+        self.bones = {}
+        self.tags = {}
+        # Sorted keys for prefix lookups, rebuilt when postings change
+        self.sorted_keys = {}
+    
+    def add(self, entry):
+        self.entries.add(entry)
+        for postings, keys in self.get_keys(entry):
+            for key in keys:
+                postings.setdefault(key, set()).add(entry)
+        self.sorted_keys.clear()
+    
+    def remove(self, entry):
+        self.entries.discard(entry)
+        for postings, keys in self.get_keys(entry):
+            for key in keys:
+                bucket = postings.get(key)
+                if bucket is not None:
+                    bucket.discard(entry)
+                    if not bucket:
+                        del postings[key]
+        self.sorted_keys.clear()
+    
+    def get_keys(self, entry):
+        return (
+            (self.words, split_words(entry.name)),
+            (self.trigrams, get_trigrams(entry.name_lower)),
+            (self.bones, {bone.lower() for bone in entry.bones}),
+            (self.tags, {tag.lower() for tag in entry.tags}),
+        )
+    
+    def match_prefix(self, postings, prefix):
+        keys = self.sorted_keys.get(id(postings))
+        if keys is None:
+            keys = self.sorted_keys[id(postings)] = sorted(postings)
+        hits = set()
+        for key in keys[bisect.bisect_left(keys, prefix):]:
+            if not key.startswith(prefix):
+                break
+            hits |= postings[key]
+        return hits
+    
+    def match_key(self, postings, value):
+        if value.endswith("*"):
+            return self.match_prefix(postings, value[:-1])
+        return set(postings.get(value, ()))
+    
+    def match_fuzzy(self, word):
+        hits = set()
+        for close in difflib.get_close_matches(word, self.words.keys(), n=20, cutoff=FUZZY_CUTOFF):
+            hits |= self.words[close]
+        return hits
+    
+    def match_name(self, text):
+        if len(text) < 3:
+            return {entry for entry in self.entries if text in entry.name_lower}
+        # Every trigram of the text must be in the name; confirm the candidates
+        candidates = None
+        for trigram in get_trigrams(text):
+            bucket = self.trigrams.get(trigram)
+            if not bucket:
+                return set()
+            candidates = set(bucket) if candidates is None else candidates & bucket
+        return {entry for entry in candidates if text in entry.name_lower}
+    
+    def match_term(self, term):
+        field, colon, value = term.partition(":")
+        if colon and value:
+            if field == "bone":
+                return self.match_key(self.bones, value)
+            if field == "tag":
+                return self.match_key(self.tags, value)
+            if field == "range":
+                return {entry for entry in self.entries if match_range(entry.frame_end - entry.frame_start, value)}
+        if term.startswith("~"):
+            return self.match_fuzzy(term[1:])
+        if term.endswith("*"):
+            return self.match_prefix(self.words, term[:-1])
+        return self.match_name(term) or self.match_fuzzy(term)
+    
+    def query(self, search_term):
+        """Entries matching every term of a lowercase search"""
+        hits = None
+        for term in search_term.split():
+            matched = self.match_term(term)
+            hits = matched if hits is None else hits & matched
+            if not hits:
+                return set()
+        return self.entries if hits is None else hits
+
+
+class EntryIndex:
+    """Sorted, searchable entries behind one of the library lists
+    
+    Filled through build(); the panel and UIList read it through search()
+    and filter_list() on every redraw.
+    """
+    
+    def __init__(self):
+        self.entries = []
+        self.entries_by_name = {}
+        self.entries_by_index = []
+        self.search_index = SearchIndex()
+        self.action_count = 0
+        # UIList order of the list's collection: new position of each item
+        self.sorted_order = []
+        # Last search and its result, the panel asks for it on every redraw
+        self.search_key = None
+        self.search_result = []
+        self.search_scores = {}
+        self.search_ranked = False
+        self.search_flags = None
+        self.search_order = []
+    
+    def build(self, entries):
+        """Index entries; their data_index is their position in the list's collection"""
+        self.entries = sorted(entries, key=lambda entry: entry.name)
+        self.entries_by_name = {entry.name: entry for entry in self.entries}
+        self.entries_by_index = [None] * len(self.entries)
+        self.sorted_order = [0] * len(self.entries)
+        for position, entry in enumerate(self.entries):
+            self.entries_by_index[entry.data_index] = entry
+            self.sorted_order[entry.data_index] = position
+        self.search_index = SearchIndex()
+        for entry in self.entries:
+            self.search_index.add(entry)
+        self.action_count = len(self.entries)
+        self.search_key = None
+    
+    def get_entries(self):
+        """All entries sorted by name"""
+        return self.entries
+    
+    def get_entry_at(self, data_index):
+        """Entry of a collection item, or None"""
+        entries = self.get_entries()
+        if 0 <= data_index < len(entries):
+            return self.entries_by_index[data_index]
+        return None
+
+    def get_entry(self, name):
+        """Cached entry of an action, or None"""
+        self.get_entries()
+        return self.entries_by_name.get(name)
+    
+    def search(self, search_term, rig_filter=None):
+        """Actions matching a lowercase search (see SearchIndex) and rig filter
+        
+        Sorted by name, or by overlap with the rig when ranking.
+        """
+        entries = self.get_entries()
+        key = (search_term, get_rig_key(rig_filter))
+        if key != self.search_key:
+            self.search_key = key
+            hits = self.search_index.query(search_term)
+            result = [entry for entry in entries if entry in hits]
+            self.search_scores = {}
+            self.search_ranked = False
+            
+            if rig_filter is not None:
+                mode, min_overlap, obj = rig_filter
+                rig_bones = get_rig_bones(obj)
+                scores = self.search_scores = {
+                    entry: get_overlap(entry.bones, entry.channels, obj, rig_bones) for entry in result
+                }
+                if mode == 'COMPATIBLE':
+                    result = [entry for entry in result if scores[entry] > 0.0 and scores[entry] >= min_overlap]
+                else:
+                    # Stable sort keeps name order among equal scores
+                    result.sort(key=lambda entry: -scores[entry])
+                    self.search_ranked = True
+            
+            self.search_result = result
+            self.search_flags = None
+        return self.search_result
+    
+    def filter_list(self, search_term, rig_filter, bitflag):
+        """UIList filter flags and sort order of the list's collection for a search"""
+        result = self.search(search_term, rig_filter)
+        if self.search_flags is None:
+            self.search_flags = [0] * self.action_count
+            for entry in result:
+                self.search_flags[entry.data_index] = bitflag
+            self.search_order = self.sorted_order
+            if self.search_ranked:
+                # Ranked matches first, hidden items keep the positions after them
+                self.search_order = [0] * self.action_count
+                shown = set(result)
+                ordered = result + [entry for entry in self.entries if entry not in shown]
+                for position, entry in enumerate(ordered):
+                    self.search_order[entry.data_index] = position
+        return self.search_flags, self.search_order
+
+
+class ActionIndex(EntryIndex):
+    """Sorted snapshot of bpy.data.actions, so the panel doesn't walk them on every redraw
+    
+    Rebuilt lazily after invalidate() - called by the msgbus handlers and
+    the library operators - or when the number of actions changes behind
+    our back. Edits to one action only update its entry (update_action).
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.action_count = -1
+        self.valid = False
+    
+    def invalidate(self):
+        self.valid = False
+    
+    def get_entries(self):
+        """All actions sorted by name"""
+        actions = bpy.data.actions
+        if not self.valid or self.action_count != len(actions):
+            self.build([ActionEntry(action, i) for i, action in enumerate(actions)])
+            self.valid = True
+        return self.entries
+    
+    def update_action(self, action):
+        """Re-read one edited action without rebuilding the index"""
+        entry = self.entries_by_name.get(action.name) if self.valid else None
+        if entry is None:
+            self.invalidate()
+            return
+        self.search_index.remove(entry)
+        _signature_cache.pop(action.as_pointer(), None)
+        entry.update(action)
+        self.search_index.add(entry)
+        self.search_key = None
+
+
+def get_rig_filter(context):
+    """(mode, min overlap, object) of the library's rig filter, or None when off"""
+    scene = context.scene
+    obj = context.active_object
+    if scene.animlib_rig_filter == 'ALL' or obj is None:
+        return None
+    return scene.animlib_rig_filter, scene.animlib_min_overlap, obj
+
+
+def get_rig_key(rig_filter):
+    """Hashable key of a rig filter, for caching search results"""
+    if rig_filter is None:
+        return None
+    mode, min_overlap, obj = rig_filter
+    return mode, min_overlap, obj.as_pointer(), len(obj.pose.bones) if obj.pose else 0
+
+
+_action_index = ActionIndex()
+
+# Owner of our msgbus subscriptions
+_msgbus_owner = object()
+
+
+def invalidate_action_index(*args):
+    """Mark the cached action index stale"""
+    _action_index.invalidate()
+    for area in getattr(bpy.context.screen, "areas", ()):
+        if area.type == 'VIEW_3D':
+            area.tag_redraw()
+
+
+@persistent
+def on_depsgraph_update(scene, depsgraph):
+    """Actions edited (keys moved, frame range changed) or added/removed"""
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Action):
+            _action_index.update_action(update.id.original)
+
+
+def subscribe_action_changes():
+    """Renames and fake user toggles don't always reach the depsgraph"""
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    for prop in ("name", "use_fake_user"):
+        bpy.msgbus.subscribe_rna(
+            key=(bpy.types.Action, prop),
+            owner=_msgbus_owner,
+            args=(),
+            notify=invalidate_action_index,
+        )
+
+
+@persistent
+def on_load_post(*args):
+    """New file: new actions, and msgbus subscriptions are dropped on load"""
+    _signature_cache.clear()
+    _rig_cache.clear()
+    _action_index.invalidate()
+    _loaded_actions.clear()
+    subscribe_action_changes()
+    if bpy.context.scene and bpy.context.scene.animlib_library_path:
+        load_library(bpy.context)
+
+
+@persistent
+def on_undo_redo(*args):
+    """Undo/redo: cached actions and rigs may be freed or their pointers reused"""
+    _signature_cache.clear()
+    _rig_cache.clear()
+    _action_index.invalidate()
+
+
+# ==================== DISK LIBRARY ====================
+
+# Manifest of a library folder: one record per action of its .blend files
+MANIFEST_NAME = "animlib_manifest.json"
+MANIFEST_VERSION = 1
+
+
+class ManifestEntry:
+    """Search data of one action in the disk library, read from its manifest record"""
+    __slots__ = ("name", "name_lower", "frame_start", "frame_end", "use_fake_user", "data_index",
+                 "bones", "channels", "tags", "file", "keys")
+    
+    def __init__(self, record, folder, data_index):
+        self.data_index = data_index
+        self.name = record["name"]
+        self.name_lower = self.name.lower()
+        self.frame_start = int(record["frame_start"])
+        self.frame_end = int(record["frame_end"])
+        self.use_fake_user = False
+        self.bones = frozenset(record.get("bones", ()))
+        self.channels = frozenset(record.get("channels", ()))
+        self.tags = frozenset(record.get("tags", ()))
+        self.file = os.path.join(folder, record["file"])
+        self.keys = record.get("keys", 0)
+
+
+def get_manifest_path(folder):
+    return os.path.join(folder, MANIFEST_NAME)
+
+
+def read_manifest(folder):
+    """Action records of a library folder, empty if it has no usable manifest"""
+    try:
+        with open(get_manifest_path(folder), encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return []
+    if manifest.get("version") != MANIFEST_VERSION:
+        return []
+    return manifest.get("actions", [])
+
+
+def write_manifest(folder, records):
+    with open(get_manifest_path(folder), "w", encoding="utf-8") as handle:
+        json.dump({"version": MANIFEST_VERSION, "actions": records}, handle, indent=1)
+
+
+def read_blend_actions(path, file, mtime):
+    """Manifest records of every action in a .blend - appends them, reads them, removes them"""
+    with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
+        names = list(data_from.actions)
+        data_to.actions = names
+    
+    records = []
+    for name, action in zip(names, data_to.actions):
+        if action is None:
+            continue
+        bones, channels = get_action_signature(action)
+        asset_data = getattr(action, "asset_data", None)
+        records.append({
+            "name": name,
+            "file": file,
+            "mtime": mtime,
+            "frame_start": int(action.frame_range[0]),
+            "frame_end": int(action.frame_range[1]),
+            "keys": sum(len(fc.keyframe_points) for fc in action.fcurves),
+            "bones": sorted(bones),
+            "channels": sorted(channels),
+            "tags": sorted(tag.name for tag in asset_data.tags) if asset_data else [],
+        })
+        _signature_cache.pop(action.as_pointer(), None)
+        bpy.data.actions.remove(action)
+    return records
+
+
+def scan_library(folder):
+    """Manifest records for every .blend under folder, re-reading only files changed since the last scan"""
+    previous = {}
+    for record in read_manifest(folder):
+        previous.setdefault(record["file"], []).append(record)
+    
+    records = []
+    rescanned = 0
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for filename in sorted(files):
+            if not filename.endswith(".blend"):
+                continue
+            path = os.path.join(root, filename)
+            file = os.path.relpath(path, folder).replace(os.sep, "/")
+            mtime = os.path.getmtime(path)
+            known = previous.get(file)
+            if known and known[0]["mtime"] == mtime:
+                records.extend(known)
+                continue
+            records.extend(read_blend_actions(path, file, mtime))
+            rescanned += 1
+    return records, rescanned
+
+
+class LibraryIndex(EntryIndex):
+    """Actions of a library folder - browsing only ever reads its manifest"""
+    
+    def __init__(self):
+        super().__init__()
+        self.folder = None
+        self.manifest_mtime = None
+    
+    def load(self, folder):
+        """Read the folder's manifest unless it is already loaded and unchanged"""
+        path = get_manifest_path(folder) if folder else None
+        mtime = os.path.getmtime(path) if path and os.path.exists(path) else None
+        if folder == self.folder and mtime == self.manifest_mtime:
+            return False
+        records = read_manifest(folder) if mtime is not None else []
+        self.build([ManifestEntry(record, folder, i) for i, record in enumerate(records)])
+        self.folder = folder
+        self.manifest_mtime = mtime
+        return True
+
+
+class LoadedActionCache:
+    """Actions appended from the disk library, least recently used first
+    
+    Beyond the size limit the oldest unused ones are removed again;
+    actions still in use (or with a fake user) stay loaded and tracked.
+    """
+    
+    def __init__(self):
+        # (file, action name) -> name of the appended action in bpy.data
+        self.loaded = OrderedDict()
+    
+    def clear(self):
+        self.loaded.clear()
+    
+    def is_loaded(self, path, name):
+        local_name = self.loaded.get((path, name))
+        return local_name is not None and local_name in bpy.data.actions
+    
+    def get(self, path, name, size):
+        """The library action, appending it on first use; None if the file doesn't have it"""
+        key = (path, name)
+        local_name = self.loaded.get(key)
+        action = bpy.data.actions.get(local_name) if local_name else None
+        if action is None:
+            with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
+                if name not in data_from.actions:
+                    return None
+                data_to.actions = [name]
+            action = data_to.actions[0]
+            self.loaded[key] = action.name
+        self.loaded.move_to_end(key)
+        self.evict(size)
+        return action
+    
+    def evict(self, size):
+        unused = []
+        for key, local_name in list(self.loaded.items()):
+            action = bpy.data.actions.get(local_name)
+            if action is None:
+                # Deleted or renamed since it was appended
+                del self.loaded[key]
+            elif action.users == 0:
+                unused.append((key, action))
+        
+        # Only unused actions count toward the limit, oldest go first
+        for key, action in unused[:max(len(unused) - size, 0)]:
+            del self.loaded[key]
+            bpy.data.actions.remove(action)
+
+
+_library_index = LibraryIndex()
+_loaded_actions = LoadedActionCache()
+
+
+def load_library(context):
+    """Read the library folder's manifest into the library list"""
+    path = context.scene.animlib_library_path
+    folder = bpy.path.abspath(path) if path else ""
+    items = context.window_manager.animlib_library_items
+    if not _library_index.load(folder) and len(items) == len(_library_index.entries):
+        return
+    
+    # Collection order matches each entry's data_index
+    items.clear()
+    for entry in sorted(_library_index.entries, key=lambda entry: entry.data_index):
+        item = items.add()
+        item.name = entry.name
+        item.file = entry.file
+
+
+def on_library_path_update(self, context):
+    """New library folder: show its manifest"""
+    load_library(context)
+
+
+class LibraryActionItem(PropertyGroup):
+    """One action of the disk library list"""
+    file: StringProperty(name="File", subtype='FILE_PATH')
 
 
 # ==================== OPERATORS ====================
@@ -28,6 +669,10 @@ class ANIMLIB_OT_apply_action(Operator):
     bl_options = {'REGISTER', 'UNDO'}
     
     action_name: StringProperty(name="Action Name")
+    library_file: StringProperty(
+        name="Library File",
+        description="Load the action on demand from this .blend of the disk library",
+    )
     
     def execute(self, context):
         obj = context.active_object
@@ -37,8 +682,21 @@ class ANIMLIB_OT_apply_action(Operator):
             self.report({'ERROR'}, "No active object selected")
             return {'CANCELLED'}
         
-        # Get the action
-        action = bpy.data.actions.get(self.action_name)
+        # Get the action - library actions are appended on first use
+        if self.library_file:
+            # Appending and evicting shift the local list's active index;
+            # keep the name, eviction can free the active action itself
+            active = get_active_action(context.scene)
+            active_name = active.name if active is not None else None
+            try:
+                action = _loaded_actions.get(self.library_file, self.action_name, context.scene.animlib_cache_size)
+            except OSError as error:
+                self.report({'ERROR'}, f"Cannot load library file: {error}")
+                return {'CANCELLED'}
+            if active_name is not None:
+                set_active_action(context.scene, active_name)
+        else:
+            action = bpy.data.actions.get(self.action_name)
         if not action:
             self.report({'ERROR'}, f"Action '{self.action_name}' not found")
             return {'CANCELLED'}
@@ -50,6 +708,12 @@ class ANIMLIB_OT_apply_action(Operator):
         # Apply the action
         obj.animation_data.action = action
         
+        # Warn when the action keys none of this rig's bones
+        bones, channels = get_action_signature(action)
+        if obj.pose is not None and bones and not bones & get_rig_bones(obj):
+            self.report({'WARNING'}, f"Applied '{self.action_name}', but it keys none of {obj.name}'s bones")
+            return {'FINISHED'}
+        
         self.report({'INFO'}, f"Applied action: {self.action_name}")
         return {'FINISHED'}
 
@@ -91,6 +755,7 @@ class ANIMLIB_OT_toggle_fake_user(Operator):
             return {'CANCELLED'}
         
         action.use_fake_user = not action.use_fake_user
+        _action_index.invalidate()
         
         if action.use_fake_user:
             self.report({'INFO'}, f"Fake user enabled for '{self.action_name}'")
@@ -127,6 +792,8 @@ class ANIMLIB_OT_new_action(Operator):
         
         # Create new action
         new_action = bpy.data.actions.new(name=self.action_name)
+        _action_index.invalidate()
+        set_active_action(context.scene, new_action.name)
         
         # Create animation data if it doesn't exist
         if not obj.animation_data:
@@ -156,6 +823,8 @@ class ANIMLIB_OT_duplicate_action(Operator):
         # Duplicate the action
         new_action = action.copy()
         new_action.name = f"{action.name}_copy"
+        _action_index.invalidate()
+        set_active_action(context.scene, new_action.name)
         
         # Apply to active object if available
         obj = context.active_object
@@ -185,8 +854,18 @@ class ANIMLIB_OT_delete_action(Operator):
             self.report({'ERROR'}, f"Action '{self.action_name}' not found")
             return {'CANCELLED'}
         
+        # Keep the active item on the same action, or its successor if it was this one
+        scene = context.scene
+        active = get_active_action(scene)
+        active_name = active.name if active is not None and active != action else None
+        
         # Remove the action
         bpy.data.actions.remove(action)
+        _action_index.invalidate()
+        if active_name is not None:
+            set_active_action(scene, active_name)
+        else:
+            scene.animlib_active_index = min(scene.animlib_active_index, len(bpy.data.actions) - 1)
         
         self.report({'INFO'}, f"Deleted action: {self.action_name}")
         return {'FINISHED'}
@@ -199,6 +878,7 @@ class ANIMLIB_OT_refresh_list(Operator):
     bl_description = "Refresh the action list"
     
     def execute(self, context):
+        _action_index.invalidate()
         self.report({'INFO'}, "Action list refreshed")
         return {'FINISHED'}
 
@@ -212,6 +892,113 @@ class ANIMLIB_OT_filter_actions(Operator):
         return {'FINISHED'}
 
 
+class ANIMLIB_OT_scan_library(Operator):
+    """Index the .blend files of the library folder into its manifest"""
+    bl_idname = "animlib.scan_library"
+    bl_label = "Scan Library"
+    bl_description = "Update the library manifest from the .blend files changed since the last scan"
+    
+    def execute(self, context):
+        path = context.scene.animlib_library_path
+        folder = bpy.path.abspath(path) if path else ""
+        if not os.path.isdir(folder):
+            self.report({'ERROR'}, "Library folder not found")
+            return {'CANCELLED'}
+        
+        try:
+            records, rescanned = scan_library(folder)
+            write_manifest(folder, records)
+        except OSError as error:
+            self.report({'ERROR'}, f"Library scan failed: {error}")
+            return {'CANCELLED'}
+        
+        load_library(context)
+        self.report({'INFO'}, f"Library: {len(records)} actions, {rescanned} files rescanned")
+        return {'FINISHED'}
+
+
+# ==================== UI LIST ====================
+
+def get_active_action(scene):
+    """Action under the list's active index, or None"""
+    index = scene.animlib_active_index
+    if 0 <= index < len(bpy.data.actions):
+        return bpy.data.actions[index]
+    return None
+
+
+def set_active_action(scene, name):
+    """Point the list's active index at an action by name
+    
+    The index is a position in bpy.data.actions, which is sorted by name,
+    so adding, renaming or removing actions moves it to another action.
+    """
+    scene.animlib_active_index = bpy.data.actions.find(name)
+
+
+class ANIMLIB_UL_actions(UIList):
+    """Action list - only the rows in view are drawn"""
+    
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        obj = context.active_object
+        is_current = bool(obj and obj.animation_data and obj.animation_data.action == item)
+        entry = _action_index.get_entry(item.name)
+        
+        row = layout.row(align=True)
+        row.prop(item, "use_fake_user", text="", emboss=False)
+        row.prop(item, "name", text="", emboss=False, icon='RADIOBUT_ON' if is_current else 'ACTION')
+        if entry:
+            row.label(text=f"[{entry.frame_start}-{entry.frame_end}]")
+            # Overlap with the active rig when the rig filter is on
+            score = _action_index.search_scores.get(entry)
+            if score is not None:
+                row.label(text=f"{score:.0%}")
+    
+    def draw_filter(self, context, layout):
+        # The panel's search field does the filtering
+        row = layout.row(align=True)
+        row.prop(context.scene, "animlib_search", text="", icon='VIEWZOOM')
+        row.prop(context.scene, "animlib_list_rows")
+    
+    def filter_items(self, context, data, propname):
+        # Flags and order come cached from the action index
+        flags, order = _action_index.filter_list(context.scene.animlib_search.lower(), get_rig_filter(context),
+                                                 self.bitflag_filter_item)
+        if len(flags) != len(getattr(data, propname)):
+            return [], []
+        return flags, order
+
+
+class ANIMLIB_UL_library(UIList):
+    """Disk library list - rows come from the manifest, nothing is loaded to draw them"""
+    
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        entry = _library_index.get_entry_at(index)
+        row = layout.row(align=True)
+        if entry is None:
+            row.label(text=item.name, icon='ERROR')
+            return
+        
+        loaded = _loaded_actions.is_loaded(entry.file, entry.name)
+        row.label(text=entry.name, icon='ACTION' if loaded else 'FILE_BLEND')
+        row.label(text=f"[{entry.frame_start}-{entry.frame_end}]")
+        score = _library_index.search_scores.get(entry)
+        if score is not None:
+            row.label(text=f"{score:.0%}")
+    
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(context.scene, "animlib_search", text="", icon='VIEWZOOM')
+        row.prop(context.scene, "animlib_list_rows")
+    
+    def filter_items(self, context, data, propname):
+        flags, order = _library_index.filter_list(context.scene.animlib_search.lower(), get_rig_filter(context),
+                                                  self.bitflag_filter_item)
+        if len(flags) != len(getattr(data, propname)):
+            return [], []
+        return flags, order
+
+
 # ==================== UI PANEL ====================
 
 class ANIMLIB_PT_main_panel(Panel):
@@ -260,70 +1047,83 @@ class ANIMLIB_PT_main_panel(Panel):
         row.operator("animlib.refresh_list", text="", icon='FILE_REFRESH')
         row.operator("animlib.new_action", text="", icon='ADD')
         
+        # ===== SOURCE =====
+        row = layout.row(align=True)
+        row.prop(scene, "animlib_source", expand=True)
+        
+        # ===== RIG FILTER =====
+        row = layout.row(align=True)
+        row.prop(scene, "animlib_rig_filter", expand=True)
+        if scene.animlib_rig_filter == 'COMPATIBLE':
+            layout.prop(scene, "animlib_min_overlap", slider=True)
+        
+        if scene.animlib_source == 'DISK':
+            self.draw_library(context, layout)
+            return
+        
         # ===== ACTION LIST =====
+        filtered_actions = _action_index.search(scene.animlib_search.lower(), get_rig_filter(context))
         row = layout.row()
-        row.label(text=f"Actions ({len(bpy.data.actions)}):", icon='ACTION')
+        row.label(text=f"Actions ({len(filtered_actions)}/{len(bpy.data.actions)}):", icon='ACTION')
         
-        # Get all actions
-        actions = bpy.data.actions
-        search_term = scene.animlib_search.lower()
+        # UIList draws only the rows in view, however big the library is
+        layout.template_list("ANIMLIB_UL_actions", "", bpy.data, "actions",
+                             scene, "animlib_active_index", rows=scene.animlib_list_rows)
         
-        # Filter actions by search term
-        filtered_actions = [
-            action for action in actions
-            if search_term in action.name.lower()
-        ]
+        # ===== ACTIVE ITEM BUTTONS =====
+        action = get_active_action(scene)
+        if action is None:
+            layout.label(text="No action selected", icon='INFO')
+            return
         
-        if len(filtered_actions) == 0:
-            layout.label(text="No actions found", icon='INFO')
-        else:
-            # Display actions in a compact list
-            for action in sorted(filtered_actions, key=lambda x: x.name):
-                # Check if this is the current action
-                is_current = False
-                if obj and obj.animation_data:
-                    if obj.animation_data.action == action:
-                        is_current = True
-                
-                # Action name and buttons on same line
-                row = layout.row(align=True)
-                
-                # Fake user toggle (shield icon)
-                fake_user_icon = 'FAKE_USER_ON' if action.use_fake_user else 'FAKE_USER_OFF'
-                op = row.operator("animlib.toggle_fake_user", text="", icon=fake_user_icon)
-                op.action_name = action.name
-                
-                # Action name with icon
-                if is_current:
-                    row.label(text=action.name, icon='RADIOBUT_ON')
-                else:
-                    row.label(text=action.name, icon='ACTION')
-                
-                # Frame range info (compact format)
-                if action.frame_range:
-                    start_frame = int(action.frame_range[0])
-                    end_frame = int(action.frame_range[1])
-                    row.label(text=f"[{start_frame}-{end_frame}]")
-                
-                # Apply button
-                if is_current:
-                    op = row.operator("animlib.apply_action", text="", icon='CHECKMARK')
-                    op.action_name = action.name
-                    op_row = row.row()
-                    op_row.enabled = False
-                else:
-                    op = row.operator("animlib.apply_action", text="", icon='PLAY')
-                    op.action_name = action.name
-                
-                # Duplicate button
-                op = row.operator("animlib.duplicate_action", text="", icon='DUPLICATE')
-                op.action_name = action.name
-                
-                # Delete button
-                op = row.operator("animlib.delete_action", text="", icon='TRASH')
-                op.action_name = action.name
-                
-                layout.separator(factor=0.3)
+        is_current = bool(obj and obj.animation_data and obj.animation_data.action == action)
+        row = layout.row(align=True)
+        
+        # Apply button
+        op = row.operator("animlib.apply_action", text="Applied" if is_current else "Apply",
+                          icon='CHECKMARK' if is_current else 'PLAY')
+        op.action_name = action.name
+        
+        # Fake user toggle (shield icon)
+        fake_user_icon = 'FAKE_USER_ON' if action.use_fake_user else 'FAKE_USER_OFF'
+        op = row.operator("animlib.toggle_fake_user", text="", icon=fake_user_icon)
+        op.action_name = action.name
+        
+        # Duplicate button
+        op = row.operator("animlib.duplicate_action", text="", icon='DUPLICATE')
+        op.action_name = action.name
+        
+        # Delete button
+        op = row.operator("animlib.delete_action", text="", icon='TRASH')
+        op.action_name = action.name
+    
+    def draw_library(self, context, layout):
+        """Disk library: folder, manifest-backed list and apply on demand"""
+        scene = context.scene
+        wm = context.window_manager
+        
+        row = layout.row(align=True)
+        row.prop(scene, "animlib_library_path", text="")
+        row.operator("animlib.scan_library", text="", icon='FILE_REFRESH')
+        
+        filtered_actions = _library_index.search(scene.animlib_search.lower(), get_rig_filter(context))
+        row = layout.row()
+        row.label(text=f"Library ({len(filtered_actions)}/{len(_library_index.entries)}):", icon='ASSET_MANAGER')
+        layout.template_list("ANIMLIB_UL_library", "", wm, "animlib_library_items",
+                             wm, "animlib_library_index", rows=scene.animlib_list_rows)
+        
+        # ===== ACTIVE ITEM BUTTONS =====
+        entry = _library_index.get_entry_at(wm.animlib_library_index)
+        if entry is None or len(wm.animlib_library_items) != len(_library_index.entries):
+            layout.label(text="No action selected", icon='INFO')
+            return
+        
+        row = layout.row(align=True)
+        op = row.operator("animlib.apply_action", text="Apply", icon='IMPORT')
+        op.action_name = entry.name
+        op.library_file = entry.file
+        row.prop(scene, "animlib_cache_size")
+        layout.label(text=f"{os.path.basename(entry.file)} - {entry.keys} keys", icon='FILE_BLEND')
 
 
 # ==================== PROPERTIES ====================
@@ -332,15 +1132,84 @@ def register_properties():
     """Register scene properties"""
     bpy.types.Scene.animlib_search = StringProperty(
         name="Search",
-        description="Filter actions by name",
+        description="Filter actions: words, word*, ~fuzzy, bone:name, tag:name, range:>100",
         default="",
     )
+    bpy.types.Scene.animlib_active_index = IntProperty(
+        name="Active Action",
+        description="Action selected in the library list",
+        default=0,
+    )
+    bpy.types.Scene.animlib_rig_filter = EnumProperty(
+        name="Rig Filter",
+        description="Match actions against the active object's bones",
+        items=[
+            ('ALL', "All", "Show every action"),
+            ('COMPATIBLE', "Compatible", "Only actions that key enough of the active rig's bones"),
+            ('RANK', "Rank", "Sort actions by how many of their bones the active rig has"),
+        ],
+        default='ALL',
+    )
+    bpy.types.Scene.animlib_min_overlap = FloatProperty(
+        name="Min Overlap",
+        description="Share of an action's bones the active rig must have",
+        default=0.5,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR',
+    )
+    bpy.types.Scene.animlib_source = EnumProperty(
+        name="Source",
+        description="Where the library's actions come from",
+        items=[
+            ('FILE', "This File", "Actions in the current file"),
+            ('DISK', "Library Folder", "Actions in the .blend files of a folder, loaded on demand"),
+        ],
+        default='FILE',
+    )
+    bpy.types.Scene.animlib_library_path = StringProperty(
+        name="Library Folder",
+        description="Folder of .blend files making up the disk library",
+        default="",
+        subtype='DIR_PATH',
+        update=on_library_path_update,
+    )
+    bpy.types.Scene.animlib_cache_size = IntProperty(
+        name="Keep Loaded",
+        description="Library actions kept in this file after use before unused ones are removed",
+        default=8,
+        min=1,
+        max=100,
+    )
+    bpy.types.WindowManager.animlib_library_items = CollectionProperty(type=LibraryActionItem)
+    bpy.types.WindowManager.animlib_library_index = IntProperty(name="Active Library Action", default=0)
+    bpy.types.Scene.animlib_list_rows = IntProperty(
+        name="Rows",
+        description="Rows shown in the library list before it scrolls",
+        default=10,
+        min=3,
+        max=50,
+    )
 
 
 def unregister_properties():
     """Unregister scene properties"""
     if hasattr(bpy.types.Scene, 'animlib_search'):
         del bpy.types.Scene.animlib_search
+    if hasattr(bpy.types.Scene, 'animlib_active_index'):
+        del bpy.types.Scene.animlib_active_index
+    if hasattr(bpy.types.Scene, 'animlib_list_rows'):
+        del bpy.types.Scene.animlib_list_rows
+    if hasattr(bpy.types.Scene, 'animlib_rig_filter'):
+        del bpy.types.Scene.animlib_rig_filter
+    if hasattr(bpy.types.Scene, 'animlib_min_overlap'):
+        del bpy.types.Scene.animlib_min_overlap
+    for prop in ('animlib_source', 'animlib_library_path', 'animlib_cache_size'):
+        if hasattr(bpy.types.Scene, prop):
+            delattr(bpy.types.Scene, prop)
+    for prop in ('animlib_library_items', 'animlib_library_index'):
+        if hasattr(bpy.types.WindowManager, prop):
+            delattr(bpy.types.WindowManager, prop)
 
 
 # ==================== REGISTRATION ====================
@@ -354,6 +1223,10 @@ classes = (
     ANIMLIB_OT_delete_action,
     ANIMLIB_OT_refresh_list,
     ANIMLIB_OT_filter_actions,
+    ANIMLIB_OT_scan_library,
+    LibraryActionItem,
+    ANIMLIB_UL_actions,
+    ANIMLIB_UL_library,
     ANIMLIB_PT_main_panel,
 )
 
@@ -363,11 +1236,26 @@ def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     register_properties()
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+    bpy.app.handlers.load_post.append(on_load_post)
+    bpy.app.handlers.undo_post.append(on_undo_redo)
+    bpy.app.handlers.redo_post.append(on_undo_redo)
+    subscribe_action_changes()
     print("Animation Library registered successfully!")
 
 
 def unregister():
     """Unregister all classes and properties"""
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    if on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_load_post)
+    if on_undo_redo in bpy.app.handlers.undo_post:
+        bpy.app.handlers.undo_post.remove(on_undo_redo)
+    if on_undo_redo in bpy.app.handlers.redo_post:
+        bpy.app.handlers.redo_post.remove(on_undo_redo)
+    if on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
+    _action_index.invalidate()
     unregister_properties()
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
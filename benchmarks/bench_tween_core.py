@@ -0,0 +1,329 @@
+"""
+Tween Core Benchmark
+Headless micro-benchmarks for tween_core.py on synthetic rigs - no Blender needed.
+
+Times the steps a slider tween goes through for 50/300/1000-bone rigs on
+sparse (blocking) and dense (mocap) actions:
+
+    build   - per-bone sorted key frame index (once per action)
+    capture - neighbour search and key sampling for every bone (once per drag)
+    update  - batched lerp/slerp blend of every bone (every slider update)
+    commit  - key merge into every channel (once per drag)
+
+Before timing anything it checks the results of the core functions
+against plain scalar references, and exits with status 1 if one is off.
+
+Usage:
+    python benchmarks/bench_tween_core.py
+    python benchmarks/bench_tween_core.py --quick --max-update-ms 5
+    python benchmarks/bench_tween_core.py --check-only
+"""
+
+import argparse
+import math
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tween_core import (  # noqa: E402
+    unique_frames, insert_frame, find_neighbours, sample_keys, merge_keys, lerp_arrays,
+    slerp_quaternion_arrays, evaluate_keys, parse_bone_name,
+    INTERPOLATION_CONSTANT, INTERPOLATION_LINEAR, INTERPOLATION_BEZIER,
+)
+
+
+# Location (3), rotation quaternion (4) and scale (3) channels per bone
+CHANNEL_SIZES = (3, 4, 3)
+
+BONE_COUNTS = (50, 300, 1000)
+
+# Action type: (frame range, frames between keys)
+ACTIONS = {
+    "sparse": (240, 8),
+    "mocap": (500, 1),
+}
+
+
+# ==================== CORRECTNESS CHECKS ====================
+
+# Largest difference allowed between a core result and its reference
+CHECK_TOLERANCE = 1e-6
+
+
+def reference_slerp(q0, q1, t):
+    """Textbook single-quaternion slerp along the shorter arc"""
+    dot = sum(a * b for a, b in zip(q0, q1))
+    if dot < 0.0:
+        q1 = [-b for b in q1]
+        dot = -dot
+    if dot > 1.0 - 1e-12:
+        result = [a + (b - a) * t for a, b in zip(q0, q1)]
+    else:
+        theta = math.acos(dot)
+        w0 = math.sin((1.0 - t) * theta) / math.sin(theta)
+        w1 = math.sin(t * theta) / math.sin(theta)
+        result = [w0 * a + w1 * b for a, b in zip(q0, q1)]
+    length = math.sqrt(sum(a * a for a in result))
+    return [a / length for a in result]
+
+
+def reference_bezier(p0, p1, p2, p3, frame):
+    """Value of a bezier segment at frame, solving its x by fine bisection"""
+    def point(t, axis):
+        u = 1.0 - t
+        return (u * u * u * p0[axis] + 3.0 * u * u * t * p1[axis]
+                + 3.0 * u * t * t * p2[axis] + t * t * t * p3[axis])
+    low, high = 0.0, 1.0
+    for _ in range(60):
+        middle = (low + high) / 2.0
+        if point(middle, 0) < frame:
+            low = middle
+        else:
+            high = middle
+    return point((low + high) / 2.0, 1)
+
+
+def check_search(rng):
+    frames = unique_frames(np.array([12.0, 4.0, 4.5, 20.0, 12.0]))
+    yield "unique_frames", frames == [4, 12, 20]
+    insert_frame(frames, 8)
+    insert_frame(frames, 12)
+    yield "insert_frame", frames == [4, 8, 12, 20]
+    # A key on the current frame is not its own neighbour
+    yield "find_neighbours on a key", find_neighbours(frames, 12) == (8, 20)
+    yield "find_neighbours between keys", find_neighbours(frames, 10) == (8, 12)
+    yield "find_neighbours past the end", find_neighbours(frames, 30) == (20, None)
+
+    key_frames = np.array([0.0, 5.0, 10.0])
+    values, exists = sample_keys(key_frames, np.array([1.0, 2.0, 3.0]), (5.0, 7.0))
+    yield "sample_keys", exists.tolist() == [True, False] and values[0] == 2.0
+    yield "parse_bone_name", parse_bone_name('pose.bones["arm\\"L"].location') == 'arm"L'
+
+
+def check_blend(rng):
+    prev_values = rng.normal(size=(50, 3))
+    next_values = rng.normal(size=(50, 3))
+    expected = prev_values * 0.7 + next_values * 0.3
+    yield "lerp_arrays", np.allclose(lerp_arrays(prev_values, next_values, 0.3), expected, atol=CHECK_TOLERANCE)
+
+    prev_quats = rng.normal(size=(200, 4))
+    next_quats = rng.normal(size=(200, 4))
+    prev_quats /= np.linalg.norm(prev_quats, axis=1)[:, None]
+    next_quats /= np.linalg.norm(next_quats, axis=1)[:, None]
+    # Include identical and opposite rows, the two special cases
+    next_quats[0] = prev_quats[0]
+    next_quats[1] = -prev_quats[1]
+    factors = rng.uniform(-0.2, 1.2, size=200)
+    result = slerp_quaternion_arrays(prev_quats, next_quats, factors)
+    expected = np.array([reference_slerp(q0, q1, t) for q0, q1, t in zip(prev_quats, next_quats, factors)])
+    yield "slerp_quaternion_arrays", np.allclose(result, expected, atol=CHECK_TOLERANCE)
+    yield "slerp ends on the keys", (
+        np.allclose(slerp_quaternion_arrays(prev_quats, next_quats, 0.0), prev_quats, atol=CHECK_TOLERANCE))
+
+
+def check_merge(rng):
+    co = np.array([[0.0, 1.0], [10.0, 2.0], [20.0, 3.0]])
+    handle_left = co - (3.0, 0.5)
+    handle_right = co + (3.0, 0.5)
+    co, handle_left, handle_right, added = merge_keys(
+        co, handle_left, handle_right, np.array([10.0, 5.0, 25.0]), np.array([4.0, 7.0, 8.0]))
+    yield "merge_keys added count", added == 2
+    # Replaced key moves with its handles, new keys are appended unsorted
+    yield "merge_keys replaces", co[1].tolist() == [10.0, 4.0] and handle_left[1, 1] == 3.5 \
+        and handle_right[1, 1] == 4.5
+    yield "merge_keys appends", co[3:].tolist() == [[5.0, 7.0], [25.0, 8.0]] \
+        and np.array_equal(handle_left[3:], co[3:]) and np.array_equal(handle_right[3:], co[3:])
+    empty = np.empty((0, 2))
+    co, handle_left, handle_right, added = merge_keys(empty, empty, empty, np.array([3.0]), np.array([1.0]))
+    yield "merge_keys on an empty curve", added == 1 and co.tolist() == [[3.0, 1.0]]
+
+
+def check_evaluate(rng):
+    co = np.array([[0.0, 0.0], [10.0, 5.0], [20.0, -5.0], [30.0, 1.0]])
+    handle_left = co.copy()
+    handle_right = co.copy()
+    # Handles a third of the way along each segment make a straight bezier
+    handle_right[:-1] = co[:-1] + (co[1:] - co[:-1]) / 3.0
+    handle_left[1:] = co[1:] - (co[1:] - co[:-1]) / 3.0
+    frames = np.linspace(-5.0, 35.0, 161)
+    linear = np.interp(frames, co[:, 0], co[:, 1])
+
+    modes = np.full(len(co), INTERPOLATION_LINEAR)
+    yield "evaluate_keys linear", np.allclose(evaluate_keys(co, handle_left, handle_right, modes, frames),
+                                              linear, atol=CHECK_TOLERANCE)
+    modes = np.full(len(co), INTERPOLATION_BEZIER)
+    yield "evaluate_keys straight bezier", np.allclose(
+        evaluate_keys(co, handle_left, handle_right, modes, frames), linear, atol=1e-4)
+    modes = np.full(len(co), INTERPOLATION_CONSTANT)
+    stepped = co[np.clip(np.searchsorted(co[:, 0], frames, side="right") - 1, 0, len(co) - 1), 1]
+    yield "evaluate_keys constant", np.allclose(
+        evaluate_keys(co, handle_left, handle_right, modes, frames), stepped, atol=CHECK_TOLERANCE)
+
+    # Curved segments against a scalar solve of the same bezier
+    handle_right[:-1, 1] += rng.normal(size=len(co) - 1)
+    handle_left[1:, 1] += rng.normal(size=len(co) - 1)
+    modes = np.full(len(co), INTERPOLATION_BEZIER)
+    inside = frames[(frames > 0.0) & (frames < 30.0)]
+    segment = np.searchsorted(co[:, 0], inside, side="right") - 1
+    expected = [reference_bezier(co[i], handle_right[i], handle_left[i + 1], co[i + 1], frame)
+                for i, frame in zip(segment, inside)]
+    yield "evaluate_keys bezier", np.allclose(evaluate_keys(co, handle_left, handle_right, modes, inside),
+                                              expected, atol=1e-4)
+
+
+def run_checks():
+    """Names of the failed checks"""
+    rng = np.random.default_rng(1)
+    failed = []
+    for check in (check_search, check_blend, check_merge, check_evaluate):
+        for name, passed in check(rng):
+            if not passed:
+                failed.append(name)
+    return failed
+
+
+# ==================== SYNTHETIC RIGS ====================
+
+def make_rig(bone_count, frame_range, key_step, rng):
+    """Per bone, a list of (key_frames, key_values) arrays - one per channel"""
+    rig = []
+    for bone in range(bone_count):
+        # Offset blocking keys per bone so bones don't share every key
+        offset = bone % key_step
+        key_frames = np.arange(offset, frame_range, key_step, dtype=np.float64)
+        channels = []
+        for size in CHANNEL_SIZES:
+            for index in range(size):
+                channels.append((key_frames, rng.normal(size=len(key_frames))))
+        rig.append(channels)
+    return rig
+
+
+# ==================== TIMED STEPS ====================
+
+def build_index(rig):
+    return [unique_frames(np.concatenate([frames for frames, values in channels])) for channels in rig]
+
+
+def capture(rig, index, current_frame):
+    """Prev/next values of every channel, packed into (bones, 10) arrays"""
+    prev_values = np.zeros((len(rig), sum(CHANNEL_SIZES)))
+    next_values = np.zeros((len(rig), sum(CHANNEL_SIZES)))
+    for bone, channels in enumerate(rig):
+        prev_frame, next_frame = find_neighbours(index[bone], current_frame)
+        if prev_frame is None or next_frame is None:
+            continue
+        for column, (key_frames, key_values) in enumerate(channels):
+            values, exists = sample_keys(key_frames, key_values, (prev_frame, next_frame))
+            prev_values[bone, column], next_values[bone, column] = values
+    return prev_values, next_values
+
+
+def blend(prev_values, next_values, blend_factor):
+    loc = lerp_arrays(prev_values[:, 0:3], next_values[:, 0:3], blend_factor)
+    quat = slerp_quaternion_arrays(prev_values[:, 3:7], next_values[:, 3:7], blend_factor)
+    scale = lerp_arrays(prev_values[:, 7:10], next_values[:, 7:10], blend_factor)
+    return np.hstack((loc, quat, scale))
+
+
+def commit(rig, blended, current_frame):
+    frames = np.array([current_frame], dtype=np.float64)
+    for bone, channels in enumerate(rig):
+        for column, (key_frames, key_values) in enumerate(channels):
+            co = np.column_stack((key_frames, key_values))
+            merge_keys(co, co.copy(), co.copy(), frames, blended[bone, column:column + 1])
+
+
+def time_ms(function, *args, repeat=1):
+    """Median wall time of a call in milliseconds, and its last result"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(samples), result
+
+
+# ==================== REPORT ====================
+
+def run(bone_counts, actions, updates):
+    rng = np.random.default_rng(0)
+    results = []
+    for action_name, (frame_range, key_step) in actions.items():
+        for bone_count in bone_counts:
+            rig = make_rig(bone_count, frame_range, key_step, rng)
+            # Mid-gap for blocking, any frame for mocap
+            current_frame = frame_range // 2 + key_step // 2
+
+            build_ms, index = time_ms(build_index, rig)
+            capture_ms, (prev_values, next_values) = time_ms(capture, rig, index, current_frame)
+            update_ms, blended = time_ms(blend, prev_values, next_values, 0.35, repeat=updates)
+            commit_ms, _ = time_ms(commit, rig, blended, current_frame)
+
+            key_count = sum(len(frames) for channels in rig for frames, values in channels)
+            results.append({
+                "action": action_name,
+                "bones": bone_count,
+                "keys": key_count,
+                "build": build_ms,
+                "capture": capture_ms,
+                "update": update_ms,
+                "commit": commit_ms,
+            })
+    return results
+
+
+def print_report(results):
+    header = f"{'action':<8} {'bones':>6} {'keys':>10} {'build ms':>10} {'capture ms':>11} " \
+             f"{'update ms':>10} {'commit ms':>10} {'update x':>9}"
+    print(header)
+    print("-" * len(header))
+
+    # Update latency scaling relative to the smallest rig of the same action
+    baseline = {}
+    for result in results:
+        base = baseline.setdefault(result["action"], result["update"])
+        scale = result["update"] / base if base else 0.0
+        print(f"{result['action']:<8} {result['bones']:>6} {result['keys']:>10} {result['build']:>10.2f} "
+              f"{result['capture']:>11.2f} {result['update']:>10.3f} {result['commit']:>10.2f} {scale:>8.1f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark tween_core on synthetic rigs")
+    parser.add_argument("--quick", action="store_true", help="Only the 50 and 300 bone rigs")
+    parser.add_argument("--updates", type=int, default=50, help="Slider updates timed per rig")
+    parser.add_argument("--max-update-ms", type=float, default=None,
+                        help="Exit with status 1 if any per-update latency is above this")
+    parser.add_argument("--check-only", action="store_true", help="Only run the correctness checks")
+    args = parser.parse_args(argv)
+
+    failed = run_checks()
+    for name in failed:
+        print(f"CHECK FAILED: {name}")
+    if failed:
+        return 1
+    print("Correctness checks passed")
+    if args.check_only:
+        return 0
+
+    bone_counts = BONE_COUNTS[:2] if args.quick else BONE_COUNTS
+    results = run(bone_counts, ACTIONS, args.updates)
+    print_report(results)
+
+    if args.max_update_ms is not None:
+        slow = [result for result in results if result["update"] > args.max_update_ms]
+        for result in slow:
+            print(f"REGRESSION: {result['action']} {result['bones']} bones - "
+                  f"{result['update']:.3f} ms per update > {args.max_update_ms} ms")
+        if slow:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,46 +8,424 @@ bl_info = {
     "category": "Animation",
 }
 
+import math
+import re
+import time
 import bpy
+import gpu
+import numpy as np
+from bpy.app.handlers import persistent
+from gpu_extras.batch import batch_for_shader
 from bpy.types import Panel, Operator, PropertyGroup
-from bpy.props import FloatProperty, PointerProperty
-from mathutils import Vector, Quaternion
+from bpy.props import (
+    FloatProperty, PointerProperty, EnumProperty, StringProperty, BoolProperty, IntProperty, CollectionProperty,
+)
+
+# Shared keyframe search and curve evaluation (tween_core.py next to this add-on)
+from tween_core import (
+    parse_bone_name, unique_frames, find_neighbours,
+    evaluate_keys, INTERPOLATION_CONSTANT, INTERPOLATION_LINEAR, INTERPOLATION_BEZIER,
+)
+
+# Shared key index, sampling and tween sessions (tween_engine.py next to this add-on)
+import tween_engine
+from tween_engine import BatchedTweenSession
 
 
 # =============================================================================
 # F-CURVE TOOLS
 # =============================================================================
 
-class GRAPH_OT_set_linear(Operator):
-    bl_idname = "graph.set_linear"
-    bl_label = "Linear"
+# Extrapolation mode: (F-curve extrapolation, Cycles modifier mode or None)
+EXTRAPOLATION_MODES = {
+    'LINEAR': ('LINEAR', None),
+    'CONSTANT': ('CONSTANT', None),
+    'CYCLE': (None, 'REPEAT'),
+    'CYCLE_OFFSET': (None, 'REPEAT_OFFSET'),
+}
+
+
+# data_path lookups per action, keyed by action pointer
+_channel_index_cache = {}
+
+
+class ActionChannelIndex:
+    # F-curves of one action grouped by bone name and by property name
+
+    def __init__(self, action):
+        self.fcurve_count = len(action.fcurves)
+        self.bone_fcurves = {}
+        self.object_fcurves = []
+        self.property_fcurves = {}
+        for fc in action.fcurves:
+            bone_name = parse_bone_name(fc.data_path)
+            if bone_name is not None:
+                self.bone_fcurves.setdefault(bone_name, []).append(fc)
+            else:
+                self.object_fcurves.append(fc)
+            prop = fc.data_path.rsplit(".", 1)[-1]
+            self.property_fcurves.setdefault(prop, []).append(fc)
+
+
+def get_channel_index(action):
+    key = action.as_pointer()
+    index = _channel_index_cache.get(key)
+    # Keying can add channels without a depsgraph invalidation
+    if index is None or index.fcurve_count != len(action.fcurves):
+        index = _channel_index_cache[key] = ActionChannelIndex(action)
+    return index
+
+
+def get_selected_actions(context):
+    # Objects sharing an action (instanced props) count once
+    actions = {}
+    for obj in context.selected_objects:
+        if obj.animation_data and obj.animation_data.action:
+            action = obj.animation_data.action
+            actions.setdefault(action.as_pointer(), action)
+    return list(actions.values())
+
+
+def parse_path_filter(text):
+    # "location, rotation_euler" -> {"location", "rotation_euler"}
+    return {part.strip() for part in text.split(",") if part.strip()}
+
+
+def get_scoped_fcurves(context, actions):
+    settings = context.scene.fcurve_tool_settings
+    props = parse_path_filter(settings.path_filter)
+
+    # Selected bones per action, so armatures sharing an action merge their selections
+    bone_names = {}
+    if settings.scope == 'BONES':
+        for bone in context.selected_pose_bones or ():
+            anim = bone.id_data.animation_data
+            if anim and anim.action:
+                bone_names.setdefault(anim.action.as_pointer(), set()).add(bone.name)
+
+    fcurves = []
+    for action in actions:
+        index = get_channel_index(action)
+
+        if settings.scope == 'BONES':
+            names = bone_names.get(action.as_pointer(), ())
+            scoped = [fc for name in names for fc in index.bone_fcurves.get(name, ())]
+        elif settings.scope == 'CHANNELS':
+            scoped = [fc for fc in action.fcurves if fc.select]
+        elif props:
+            # Whole action with a filter - read the property groups directly
+            fcurves.extend(fc for prop in props for fc in index.property_fcurves.get(prop, ()))
+            continue
+        else:
+            scoped = list(action.fcurves)
+
+        if props:
+            scoped = [fc for fc in scoped if fc.data_path.rsplit(".", 1)[-1] in props]
+        fcurves.extend(scoped)
+
+    return fcurves
+
+
+def is_plain_cycles(mod, cycle_mode):
+    return (mod.type == 'CYCLES' and mod.mode_before == cycle_mode and mod.mode_after == cycle_mode
+            and mod.cycles_before == 0 and mod.cycles_after == 0
+            and mod.active and not mod.mute and not mod.use_restricted_range and not mod.use_influence)
+
+
+def set_extrapolation(fcurves, mode):
+    extrapolation, cycle_mode = EXTRAPOLATION_MODES[mode]
+    changed = 0
+    skipped = 0
+
+    for fcurve in fcurves:
+        mods = fcurve.modifiers
+
+        if cycle_mode is None:
+            if not len(mods) and fcurve.extrapolation == extrapolation:
+                skipped += 1
+                continue
+            for mod in reversed(list(mods)):
+                mods.remove(mod)
+            fcurve.extrapolation = extrapolation
+
+        else:
+            if len(mods) == 1 and is_plain_cycles(mods[0], cycle_mode):
+                skipped += 1
+                continue
+            # A lone Cycles modifier only needs its modes switched
+            if len(mods) == 1 and mods[0].type == 'CYCLES':
+                mod = mods[0]
+            else:
+                for mod in reversed(list(mods)):
+                    mods.remove(mod)
+                mod = mods.new(type='CYCLES')
+            mod.mode_before = cycle_mode
+            mod.mode_after = cycle_mode
+            mod.cycles_before = 0
+            mod.cycles_after = 0
+            mod.active = True
+            mod.mute = False
+            mod.use_restricted_range = False
+            mod.use_influence = False
+
+        changed += 1
+
+    return changed, skipped
+
+
+class ExtrapolationOperator:
     bl_options = {'REGISTER', 'UNDO'}
+    mode = 'LINEAR'
 
     @classmethod
     def poll(cls, context):
         return bool(context.selected_objects)
 
     def execute(self, context):
-        fcurves_found = []
-        for obj in context.selected_objects:
-            if obj.animation_data and obj.animation_data.action:
-                fcurves_found.extend(obj.animation_data.action.fcurves)
+        actions = get_selected_actions(context)
+        fcurves = get_scoped_fcurves(context, actions)
 
-        if not fcurves_found:
+        if not fcurves:
             self.report({'WARNING'}, "No F-curves found")
             return {'CANCELLED'}
 
-        for fcurve in fcurves_found:
-            while fcurve.modifiers:
-                fcurve.modifiers.remove(fcurve.modifiers[0])
-            fcurve.extrapolation = 'LINEAR'
-
+        changed, skipped = set_extrapolation(fcurves, self.mode)
+        self.report({'INFO'}, f"{self.bl_label}: {changed} F-curves changed, "
+                              f"{skipped} already set ({len(actions)} actions)")
         return {'FINISHED'}
 
 
-class GRAPH_OT_set_constant(Operator):
+class GRAPH_OT_set_linear(ExtrapolationOperator, Operator):
+    bl_idname = "graph.set_linear"
+    bl_label = "Linear"
+    mode = 'LINEAR'
+
+
+class GRAPH_OT_set_constant(ExtrapolationOperator, Operator):
     bl_idname = "graph.set_constant"
     bl_label = "Constant"
+    mode = 'CONSTANT'
+
+
+class GRAPH_OT_set_cycle(ExtrapolationOperator, Operator):
+    bl_idname = "graph.set_cycle"
+    bl_label = "Cycle"
+    mode = 'CYCLE'
+
+
+class GRAPH_OT_set_cycle_offset(ExtrapolationOperator, Operator):
+    bl_idname = "graph.set_cycle_offset"
+    bl_label = "Cycle Offset"
+    mode = 'CYCLE_OFFSET'
+
+
+# Approximate memory of one keyframe (BezTriple) and one F-curve without keys
+KEYFRAME_BYTES = 64
+FCURVE_BYTES = 256
+
+# Most frames sampled when timing F-curve evaluation
+TIMING_SAMPLES = 250
+
+
+def read_keys(fcurve):
+    co = np.empty(len(fcurve.keyframe_points) * 2)
+    fcurve.keyframe_points.foreach_get("co", co)
+    co = co.reshape(-1, 2)
+    return co[:, 0], co[:, 1]
+
+
+def decimate_mask(frames, values, tolerance):
+    # Ramer-Douglas-Peucker on the key values: keep the keys a straight
+    # line between the kept neighbours can't reproduce within tolerance
+    keep = np.zeros(len(frames), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(frames) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        position = (frames[start + 1:end] - frames[start]) / (frames[end] - frames[start])
+        line = values[start] + (values[end] - values[start]) * position
+        error = np.abs(values[start + 1:end] - line)
+        worst = int(np.argmax(error))
+        if error[worst] > tolerance:
+            split = start + 1 + worst
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return keep
+
+
+def time_evaluation(fcurves, frames):
+    start = time.perf_counter()
+    for fc in fcurves:
+        for frame in frames:
+            fc.evaluate(frame)
+    return time.perf_counter() - start
+
+
+# 'pose.bones["arm"]["ik_fk"]' -> custom property "ik_fk" of 'pose.bones["arm"]'
+CUSTOM_PROPERTY_PATH = re.compile(r'^(.*)\["((?:[^"\\]|\\.)*)"\]$')
+
+
+def split_data_path(data_path):
+    # (parent path, last segment, whether the segment is a custom property)
+    match = CUSTOM_PROPERTY_PATH.match(data_path)
+    if match:
+        name = re.sub(r'\\(.)', r'\1', match.group(2))
+        return match.group(1), name, True
+    parent_path, _, name = data_path.rpartition(".")
+    return parent_path, name, False
+
+
+def cast_like(current, value):
+    # F-curves store floats; bool and int properties want their own type
+    if isinstance(current, bool):
+        return value >= 0.5
+    if isinstance(current, int):
+        return int(round(value))
+    return value
+
+
+def set_static_value(owners, data_path, index, value):
+    # Keep the constant value on the property once its F-curve is gone.
+    # False if an owner can't take it (enums, read-only or odd paths), so
+    # the curve is kept instead
+    parent_path, name, is_custom = split_data_path(data_path)
+    for owner in owners:
+        try:
+            parent = owner.path_resolve(parent_path) if parent_path else owner
+        except ValueError:
+            # The curve animates nothing on this owner
+            continue
+        try:
+            current = parent[name] if is_custom else getattr(parent, name)
+            if isinstance(current, str):
+                return False
+            if hasattr(current, "__len__"):
+                current[index] = cast_like(current[index], value)
+            elif is_custom:
+                parent[name] = cast_like(current, value)
+            else:
+                setattr(parent, name, cast_like(current, value))
+        except (AttributeError, KeyError, IndexError, TypeError, ValueError):
+            return False
+    return True
+
+
+# Per-key settings that travel with a key when the keys are compacted
+KEY_FLOAT_PROPS = ("co", "handle_left", "handle_right", "back", "amplitude", "period")
+KEY_INT_PROPS = ("interpolation", "easing", "handle_left_type", "handle_right_type", "type")
+
+
+# Passes of putting keys back before decimating a curve is given up
+DECIMATE_PASSES = 8
+
+
+def read_key_data(fcurve):
+    # Every per-key property as one (keys, size) array
+    points = fcurve.keyframe_points
+    count = len(points)
+    data = {}
+    for prop in KEY_FLOAT_PROPS:
+        size = 2 if prop in ("co", "handle_left", "handle_right") else 1
+        values = np.empty(count * size)
+        points.foreach_get(prop, values)
+        data[prop] = values.reshape(count, size)
+    for prop in KEY_INT_PROPS:
+        values = np.empty(count, dtype=np.int32)
+        points.foreach_get(prop, values)
+        data[prop] = values.reshape(count, 1)
+    return data
+
+
+def write_key_data(fcurve, data, keep):
+    # Rebuild the curve from the kept rows with one foreach_set per
+    # property; surplus points go from the end, where removal is cheap
+    points = fcurve.keyframe_points
+    count = int(np.count_nonzero(keep))
+    if len(points) > count:
+        for _ in range(len(points) - count):
+            points.remove(points[-1], fast=True)
+    elif len(points) < count:
+        points.add(count - len(points))
+    for prop, values in data.items():
+        points.foreach_set(prop, values[keep].ravel())
+    fcurve.update()
+
+
+def evaluate_key_data(data, frames):
+    codes = INTERPOLATION_CODES[data["interpolation"].ravel()]
+    return evaluate_keys(data["co"], data["handle_left"], data["handle_right"], codes, frames)
+
+
+def decimate_fcurve(fcurve, tolerance):
+    # Drop the keys decimate_mask finds redundant, then check the rebuilt
+    # curve - whose auto handles Blender recalculates - against the
+    # original at every frame. Segments that miss the tolerance get their
+    # keys back until the curve fits. Returns the number of keys removed
+    data = read_key_data(fcurve)
+    modes = data["interpolation"].ravel()
+    if len(modes) < 3 or modes.max() >= len(INTERPOLATION_CODES):
+        # Easing presets can't be checked without Blender evaluating them
+        return 0
+    frames = data["co"][:, 0]
+    keep = decimate_mask(frames, data["co"][:, 1], tolerance)
+    if keep.all():
+        return 0
+
+    samples = np.union1d(np.arange(np.ceil(frames[0]), frames[-1] + 1.0), frames)
+    original = evaluate_key_data(data, samples)
+    for _ in range(DECIMATE_PASSES):
+        write_key_data(fcurve, data, keep)
+        error = np.abs(evaluate_key_data(read_key_data(fcurve), samples) - original)
+        bad = error > tolerance
+        if not bad.any():
+            return len(keep) - int(np.count_nonzero(keep))
+        # Restore every key inside the kept segments that drifted
+        kept = np.flatnonzero(keep)
+        segments = np.unique(np.clip(np.searchsorted(frames[kept], samples[bad], side="right") - 1,
+                                     0, len(kept) - 2))
+        for segment in segments:
+            keep[kept[segment]:kept[segment + 1]] = True
+        if np.count_nonzero(keep) == len(kept):
+            # Drift from handles of whole segments already restored
+            break
+
+    keep[:] = True
+    write_key_data(fcurve, data, keep)
+    return 0
+
+
+def get_exclusive_actions(owners):
+    # Actions whose every user is one of the given owners: the ones whose
+    # curves can go once the owners hold the static value themselves
+    exclusive = set()
+    for key, objs in owners.items():
+        action = objs[0].animation_data.action
+        if action.users - int(action.use_fake_user) == len(objs):
+            exclusive.add(key)
+    return exclusive
+
+
+def unwrap_offsets(values, curve_starts):
+    # Multiples of 360 degrees to add to each key so no step between
+    # neighbouring keys of the same curve is larger than 180 degrees.
+    # values holds the keys of many curves back to back; curve_starts
+    # marks the first key of each curve
+    steps = np.diff(values, prepend=values[:1])
+    jumps = -np.round(steps / math.tau) * math.tau
+    jumps[curve_starts] = 0.0
+    offsets = np.cumsum(jumps)
+    # Every curve starts from zero offset
+    first = np.flatnonzero(curve_starts)
+    return offsets - offsets[first][np.cumsum(curve_starts) - 1]
+
+
+class GRAPH_OT_unwrap_euler(Operator):
+    bl_idname = "graph.unwrap_euler"
+    bl_label = "Unwrap Euler"
+    bl_description = "Remove 360 degree flips from Euler rotation F-curves"
     bl_options = {'REGISTER', 'UNDO'}
 
     @classmethod
@@ -55,104 +433,895 @@ class GRAPH_OT_set_constant(Operator):
         return bool(context.selected_objects)
 
     def execute(self, context):
-        fcurves_found = []
-        for obj in context.selected_objects:
-            if obj.animation_data and obj.animation_data.action:
-                fcurves_found.extend(obj.animation_data.action.fcurves)
-
-        if not fcurves_found:
-            self.report({'WARNING'}, "No F-curves found")
+        fcurves = [fc for fc in get_scoped_fcurves(context, get_selected_actions(context))
+                   if fc.data_path.endswith("rotation_euler") and len(fc.keyframe_points)]
+        if not fcurves:
+            self.report({'WARNING'}, "No Euler rotation F-curves found")
             return {'CANCELLED'}
 
-        for fcurve in fcurves_found:
-            while fcurve.modifiers:
-                fcurve.modifiers.remove(fcurve.modifiers[0])
-            fcurve.extrapolation = 'CONSTANT'
-
+        # Every key of every curve in one set of arrays
+        counts = [len(fc.keyframe_points) for fc in fcurves]
+        bounds = np.concatenate(([0], np.cumsum(counts)))
+        keys = np.empty((3, bounds[-1], 2))
+        for fc, start, end in zip(fcurves, bounds[:-1], bounds[1:]):
+            points = fc.keyframe_points
+            for row, prop in enumerate(("co", "handle_left", "handle_right")):
+                data = np.empty((end - start) * 2)
+                points.foreach_get(prop, data)
+                keys[row, start:end] = data.reshape(-1, 2)
+
+        curve_starts = np.zeros(bounds[-1], dtype=bool)
+        curve_starts[bounds[:-1]] = True
+        offsets = unwrap_offsets(keys[0, :, 1], curve_starts)
+        if not offsets.any():
+            self.report({'INFO'}, f"No flips in {len(fcurves)} Euler F-curves")
+            return {'FINISHED'}
+
+        # Handles move with their key
+        keys[:, :, 1] += offsets
+        fixed_curves = 0
+        for fc, start, end in zip(fcurves, bounds[:-1], bounds[1:]):
+            if not offsets[start:end].any():
+                continue
+            points = fc.keyframe_points
+            for row, prop in enumerate(("co", "handle_left", "handle_right")):
+                points.foreach_set(prop, keys[row, start:end].ravel())
+            fc.update()
+            fixed_curves += 1
+
+        self.report({'INFO'}, f"Unwrapped {np.count_nonzero(offsets)} keys on {fixed_curves} "
+                              f"of {len(fcurves)} Euler F-curves")
         return {'FINISHED'}
 
 
-class GRAPH_OT_set_cycle(Operator):
-    bl_idname = "graph.set_cycle"
-    bl_label = "Cycle"
+class GRAPH_OT_clean_channels(Operator):
+    bl_idname = "graph.clean_channels"
+    bl_label = "Clean Channels"
+    bl_description = "Remove constant F-curves and decimate redundant keys within a tolerance"
     bl_options = {'REGISTER', 'UNDO'}
 
+    tolerance: FloatProperty(
+        name="Tolerance", description="Largest value error allowed when removing keys",
+        default=0.001, min=0.0, precision=4, step=0.01)
+
+    remove_static: BoolProperty(
+        name="Remove Constant", description="Remove F-curves whose keys are all within tolerance",
+        default=True)
+
+    decimate: BoolProperty(
+        name="Decimate", description="Remove keys the rebuilt curve still follows within the tolerance",
+        default=True)
+
     @classmethod
     def poll(cls, context):
         return bool(context.selected_objects)
 
     def execute(self, context):
-        fcurves_found = []
+        # Owners per action, to keep constant values once their curve is removed
+        owners = {}
         for obj in context.selected_objects:
             if obj.animation_data and obj.animation_data.action:
-                fcurves_found.extend(obj.animation_data.action.fcurves)
+                owners.setdefault(obj.animation_data.action.as_pointer(), []).append(obj)
 
-        if not fcurves_found:
+        actions = get_selected_actions(context)
+        fcurves = get_scoped_fcurves(context, actions)
+        if not fcurves:
             self.report({'WARNING'}, "No F-curves found")
             return {'CANCELLED'}
 
-        for fcurve in fcurves_found:
-            while fcurve.modifiers:
-                fcurve.modifiers.remove(fcurve.modifiers[0])
-            mod = fcurve.modifiers.new(type='CYCLES')
-            mod.mode_before = 'REPEAT'
-            mod.mode_after = 'REPEAT'
-
+        scene = context.scene
+        frames = np.linspace(scene.frame_start, scene.frame_end,
+                             min(TIMING_SAMPLES, scene.frame_end - scene.frame_start + 1))
+        time_before = time_evaluation(fcurves, frames)
+
+        curve_action = {fc.as_pointer(): action for action in actions for fc in action.fcurves}
+        # Unselected objects or NLA strips using the action would lose the value
+        exclusive = get_exclusive_actions(owners)
+        shared_curves = 0
+        unset_curves = 0
+        removed_curves = 0
+        removed_keys = 0
+        remaining = []
+
+        for fc in fcurves:
+            key_frames, key_values = read_keys(fc)
+            # Modifiers and drivers make the keys only part of the story
+            plain = not len(fc.modifiers)
+
+            static = self.remove_static and plain and len(key_values) and np.ptp(key_values) <= self.tolerance
+            action = curve_action[fc.as_pointer()]
+            if static and action.as_pointer() not in exclusive:
+                shared_curves += 1
+            elif static and not set_static_value(owners.get(action.as_pointer(), ()), fc.data_path,
+                                                 fc.array_index, float(key_values[0])):
+                unset_curves += 1
+            elif static:
+                removed_keys += len(key_values)
+                removed_curves += 1
+                action.fcurves.remove(fc)
+                continue
+
+            if self.decimate and plain and len(key_values) > 2:
+                removed_keys += decimate_fcurve(fc, self.tolerance)
+
+            remaining.append(fc)
+
+        time_after = time_evaluation(remaining, frames)
+        speedup = time_before / time_after if time_after else float("inf")
+        saved = removed_keys * KEYFRAME_BYTES + removed_curves * FCURVE_BYTES
+
+        self.report({'INFO'}, f"Removed {removed_curves} constant F-curves and {removed_keys} keys "
+                              f"(~{saved / 1024:.1f} KB), evaluation {speedup:.1f}x faster")
+        if shared_curves:
+            self.report({'WARNING'}, f"Kept {shared_curves} constant F-curves of actions also used by "
+                                     f"unselected objects or NLA strips")
+        if unset_curves:
+            self.report({'WARNING'}, f"Kept {unset_curves} constant F-curves whose property can't hold "
+                                     f"a static value")
         return {'FINISHED'}
 
 
-class GRAPH_OT_set_cycle_offset(Operator):
-    bl_idname = "graph.set_cycle_offset"
-    bl_label = "Cycle Offset"
-    bl_options = {'REGISTER', 'UNDO'}
+def describe_fcurve(data_path, array_index):
+    # 'pose.bones["arm.L"].rotation_euler', 1 -> 'arm.L rotation_euler[1]'
+    prop = data_path.rsplit(".", 1)[-1]
+    bone_name = parse_bone_name(data_path)
+    label = f"{prop}[{array_index}]"
+    return f"{bone_name} {label}" if bone_name is not None else label
+
+
+class GRAPH_OT_profile_fcurves(Operator):
+    bl_idname = "graph.profile_fcurves"
+    bl_label = "Profile F-Curves"
+    bl_description = "Time F-curve evaluation over the frame range and list the most expensive curves"
+    bl_options = {'REGISTER'}
 
     @classmethod
     def poll(cls, context):
         return bool(context.selected_objects)
 
     def execute(self, context):
-        fcurves_found = []
-        for obj in context.selected_objects:
-            if obj.animation_data and obj.animation_data.action:
-                fcurves_found.extend(obj.animation_data.action.fcurves)
-
-        if not fcurves_found:
+        settings = context.scene.fcurve_tool_settings
+        scene = context.scene
+        frames = np.linspace(scene.frame_start, scene.frame_end,
+                             min(TIMING_SAMPLES, scene.frame_end - scene.frame_start + 1))
+
+        timings = []
+        for action in get_selected_actions(context):
+            for fc in action.fcurves:
+                timings.append((time_evaluation((fc,), frames), action, fc))
+        if not timings:
             self.report({'WARNING'}, "No F-curves found")
             return {'CANCELLED'}
 
-        for fcurve in fcurves_found:
-            while fcurve.modifiers:
-                fcurve.modifiers.remove(fcurve.modifiers[0])
-            mod = fcurve.modifiers.new(type='CYCLES')
-            mod.mode_before = 'REPEAT_OFFSET'
-            mod.mode_after = 'REPEAT_OFFSET'
+        timings.sort(key=lambda timing: timing[0], reverse=True)
+        total = sum(timing[0] for timing in timings)
+        top = timings[:settings.profile_count]
+
+        settings.profile.clear()
+        for seconds, action, fc in top:
+            entry = settings.profile.add()
+            entry.action_name = action.name
+            entry.data_path = fc.data_path
+            entry.array_index = fc.array_index
+            entry.cost = seconds / len(frames) * 1e6
+            entry.keys = len(fc.keyframe_points)
+            entry.modifiers = len(fc.modifiers)
+
+        share = sum(timing[0] for timing in top) / total * 100.0 if total else 0.0
+        self.report({'INFO'}, f"{len(timings)} F-curves take {total * 1000.0:.1f} ms for {len(frames)} frames, "
+                              f"top {len(top)} account for {share:.0f}%")
+        return {'FINISHED'}
+
 
+class GRAPH_OT_select_profiled(Operator):
+    bl_idname = "graph.select_profiled"
+    bl_label = "Select Profiled"
+    bl_description = "Select the profiled F-curves and scope the F-curve tools to selected channels"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.fcurve_tool_settings.profile)
+
+    def execute(self, context):
+        settings = context.scene.fcurve_tool_settings
+        actions = {entry.action_name: bpy.data.actions.get(entry.action_name) for entry in settings.profile}
+        for action in actions.values():
+            if action is not None:
+                for fc in action.fcurves:
+                    fc.select = False
+
+        selected = 0
+        for entry in settings.profile:
+            action = actions[entry.action_name]
+            fc = action.fcurves.find(entry.data_path, index=entry.array_index) if action else None
+            if fc is not None:
+                fc.select = True
+                selected += 1
+
+        settings.scope = 'CHANNELS'
+        self.report({'INFO'}, f"Selected {selected} profiled F-curves")
         return {'FINISHED'}
 
 
+class FCurveProfileEntry(PropertyGroup):
+
+    # A name, not an ID pointer: pointers would add a user to the action
+    action_name: StringProperty()
+    data_path: StringProperty()
+    array_index: IntProperty()
+    cost: FloatProperty(name="Cost", description="Microseconds per evaluation")
+    keys: IntProperty()
+    modifiers: IntProperty()
+
+
+class FCurveToolSettings(PropertyGroup):
+
+    scope: EnumProperty(
+        name="Scope",
+        description="Which F-curves of the selected objects' actions the tools change",
+        items=[
+            ('ALL', "All", "Every F-curve of the selected objects' actions"),
+            ('BONES', "Selected Bones", "F-curves of the selected pose bones"),
+            ('CHANNELS', "Selected Channels", "F-curves selected in the Graph Editor"),
+        ],
+        default='ALL')
+
+    path_filter: StringProperty(
+        name="Channels",
+        description="Only F-curves of these properties, comma separated (e.g. location, rotation_euler)",
+        default="")
+
+    profile: CollectionProperty(type=FCurveProfileEntry)
+
+    profile_count: IntProperty(
+        name="Top",
+        description="How many of the most expensive F-curves the profiler lists",
+        default=10,
+        min=1,
+        max=100)
+
+
 # =============================================================================
 # MOTION PATHS
 # =============================================================================
 
+# Live paths are drawn by the add-on itself: Blender's own motion path
+# buffers can't be allocated or partially refreshed from Python
+
+PATH_COLOR = (1.0, 0.55, 0.1, 0.9)
+
+# evaluate_keys codes indexed by the integer value foreach_get reads for
+# KeyframePoint.interpolation (CONSTANT, LINEAR, BEZIER; easing presets follow)
+INTERPOLATION_CODES = np.array([INTERPOLATION_CONSTANT, INTERPOLATION_LINEAR, INTERPOLATION_BEZIER])
+
+# Constraints that move bones other than their owner
+CHAIN_CONSTRAINTS = {'IK', 'SPLINE_IK'}
+
+
+def sample_fcurve(fc, frames):
+    points = fc.keyframe_points
+    modes = np.empty(len(points), dtype=np.int32)
+    points.foreach_get("interpolation", modes)
+    # Easing presets, modifiers and extrapolated ends go through Blender
+    if not len(modes) or modes.max() >= len(INTERPOLATION_CODES) or fc.modifiers or fc.extrapolation != 'CONSTANT':
+        evaluate = fc.evaluate
+        return np.array([evaluate(frame) for frame in frames], dtype=np.float64)
+
+    keys = np.empty((3, len(points) * 2))
+    points.foreach_get("co", keys[0])
+    points.foreach_get("handle_left", keys[1])
+    points.foreach_get("handle_right", keys[2])
+    co, handle_left, handle_right = keys.reshape(3, -1, 2)
+    return evaluate_keys(co, handle_left, handle_right, INTERPOLATION_CODES[modes], frames)
+
+
+def get_target_fcurves(owner, bone_name):
+    anim = owner.animation_data
+    if not anim or not anim.action:
+        return []
+    index = get_channel_index(anim.action)
+    fcurves = index.object_fcurves if bone_name is None else index.bone_fcurves.get(bone_name, [])
+    # Muted curves and curves in muted groups are not applied by Blender either
+    return [fc for fc in fcurves if not fc.mute and not (fc.group and fc.group.mute)]
+
+
+def quaternion_matrices(quats):
+    w, x, y, z = (quats / np.linalg.norm(quats, axis=1)[:, None]).T
+    return np.stack([
+        np.stack([1.0 - 2.0 * (y * y + z * z), 2.0 * (x * y - w * z), 2.0 * (x * z + w * y)], axis=-1),
+        np.stack([2.0 * (x * y + w * z), 1.0 - 2.0 * (x * x + z * z), 2.0 * (y * z - w * x)], axis=-1),
+        np.stack([2.0 * (x * z - w * y), 2.0 * (y * z + w * x), 1.0 - 2.0 * (x * x + y * y)], axis=-1),
+    ], axis=1)
+
+
+def euler_matrices(angles, order):
+    # Blender's 'XYZ' applies X first: Rz @ Ry @ Rx
+    result = np.broadcast_to(np.identity(3), (len(angles), 3, 3))
+    for axis_name in order:
+        axis = "XYZ".index(axis_name)
+        i, j = ((1, 2), (2, 0), (0, 1))[axis]
+        cos = np.cos(angles[:, axis])
+        sin = np.sin(angles[:, axis])
+        rotation = np.zeros((len(angles), 3, 3))
+        rotation[:, axis, axis] = 1.0
+        rotation[:, i, i] = cos
+        rotation[:, i, j] = -sin
+        rotation[:, j, i] = sin
+        rotation[:, j, j] = cos
+        result = rotation @ result
+    return result
+
+
+def local_matrices(target, fcurves, frames):
+    # (frames, 4, 4) loc/rot/scale matrices; unkeyed channels keep their current value
+    channels = {(fc.data_path.rsplit(".", 1)[-1], fc.array_index): fc for fc in fcurves}
+
+    def sample(prop, size):
+        values = np.tile(np.array(getattr(target, prop), dtype=np.float64), (len(frames), 1))
+        for index in range(size):
+            fc = channels.get((prop, index))
+            if fc is not None:
+                values[:, index] = sample_fcurve(fc, frames)
+        return values
+
+    if target.rotation_mode == 'QUATERNION':
+        rotation = quaternion_matrices(sample("rotation_quaternion", 4))
+    else:
+        rotation = euler_matrices(sample("rotation_euler", 3), target.rotation_mode)
+
+    matrices = np.zeros((len(frames), 4, 4))
+    matrices[:, :3, :3] = rotation * sample("scale", 3)[:, None, :]
+    matrices[:, :3, 3] = sample("location", 3)
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def has_animation(obj):
+    anim = obj.animation_data
+    return bool(anim and (anim.action or anim.drivers or anim.nla_tracks))
+
+
+def has_delta_transforms(obj):
+    return (any(obj.delta_location) or any(obj.delta_rotation_euler)
+            or tuple(obj.delta_rotation_quaternion) != (1.0, 0.0, 0.0, 0.0)
+            or tuple(obj.delta_scale) != (1.0, 1.0, 1.0))
+
+
+def can_evaluate_fk(owner, bone_name):
+    # Plain keyed FK only - anything the depsgraph adds on top (constraints,
+    # drivers, NLA, animated or non-object parents) needs frame stepping
+    anim = owner.animation_data
+    if anim and (anim.drivers or anim.use_tweak_mode or any(not track.mute for track in anim.nla_tracks)):
+        return False
+    if owner.constraints or owner.rotation_mode == 'AXIS_ANGLE' or has_delta_transforms(owner):
+        return False
+    if owner.parent and owner.parent_type != 'OBJECT':
+        return False
+    for parent in owner.parent_recursive:
+        if has_animation(parent) or parent.constraints:
+            return False
+    if bone_name is None:
+        return True
+
+    bone = owner.pose.bones.get(bone_name)
+    if bone is None:
+        return False
+    if any(con.type in CHAIN_CONSTRAINTS for pbone in owner.pose.bones for con in pbone.constraints):
+        return False
+    for pbone in [bone] + list(bone.parent_recursive):
+        if pbone.constraints or pbone.rotation_mode == 'AXIS_ANGLE':
+            return False
+        if not pbone.bone.use_inherit_rotation or not pbone.bone.use_local_location:
+            return False
+        if getattr(pbone.bone, "inherit_scale", 'FULL') != 'FULL':
+            return False
+    return True
+
+
+class FKEvaluator:
+    # Batched (frames, 4, 4) world matrices built from F-curves; poses are
+    # memoised per bone so selected bones sharing a chain compose it once
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.object_worlds = {}
+        self.bone_poses = {}
+
+    def object_world(self, obj):
+        key = obj.as_pointer()
+        if key not in self.object_worlds:
+            parent = np.array(obj.parent.matrix_world @ obj.matrix_parent_inverse) if obj.parent else np.identity(4)
+            self.object_worlds[key] = parent @ local_matrices(obj, get_target_fcurves(obj, None), self.frames)
+        return self.object_worlds[key]
+
+    def bone_pose(self, obj, pbone):
+        # parent_pose @ (parent_rest^-1 @ rest) @ basis, down from the root
+        key = (obj.as_pointer(), pbone.name)
+        if key not in self.bone_poses:
+            rest = np.array(pbone.bone.matrix_local)
+            basis = local_matrices(pbone, get_target_fcurves(obj, pbone.name), self.frames)
+            if pbone.parent is None:
+                pose = rest @ basis
+            else:
+                offset = np.linalg.inv(np.array(pbone.parent.bone.matrix_local)) @ rest
+                pose = self.bone_pose(obj, pbone.parent) @ offset @ basis
+            self.bone_poses[key] = pose
+        return self.bone_poses[key]
+
+    def positions(self, owner, bone_name):
+        world = self.object_world(owner)
+        if bone_name is not None:
+            world = world @ self.bone_pose(owner, owner.pose.bones[bone_name])
+        return world[:, :3, 3]
+
+
+class CachedPath:
+    # World positions of one object or bone over a frame range
+
+    def __init__(self, owner, bone_name, frame_start, frame_end):
+        self.owner = owner
+        # Undo and redo replace the owner, it is found again by name
+        self.owner_name = owner.name
+        self.bone_name = bone_name
+        self.frame_start = frame_start
+        self.frame_end = frame_end
+        self.positions = np.zeros((frame_end - frame_start + 1, 3))
+        self.use_fk = False
+        self.dirty = None
+        self.batch = None
+
+    def get_channel_bones(self):
+        # Bones whose F-curves move this path (object-level curves always
+        # do); None means any bone of the owner can
+        if self.bone_name is None:
+            return set()
+        if not self.use_fk:
+            # Frame-stepped for its constraints or IK: controllers and
+            # constraint targets move it too
+            return None
+        bone = self.owner.pose.bones[self.bone_name]
+        return {bone.name} | {parent.name for parent in bone.parent_recursive}
+
+    def mark_dirty(self, start, end):
+        if self.dirty is not None:
+            start = min(start, self.dirty[0])
+            end = max(end, self.dirty[1])
+        start = max(start, self.frame_start)
+        end = min(end, self.frame_end)
+        self.dirty = (int(start), int(math.ceil(end))) if start <= end else None
+
+    def move(self, center):
+        return False
+
+    def store(self, frames, positions):
+        self.positions[np.asarray(frames) - self.frame_start] = positions
+
+    def ordered_positions(self):
+        return self.positions
+
+    def read_position(self):
+        if self.bone_name is None:
+            return self.owner.matrix_world.translation
+        bone = self.owner.pose.bones[self.bone_name]
+        return (self.owner.matrix_world @ bone.matrix).translation
+
+
+class WindowedPath(CachedPath):
+    # Frames around the playhead in a ring buffer: each frame has a fixed
+    # slot (frame % size), so sliding the window only evaluates new frames
+
+    def __init__(self, owner, bone_name, center, radius):
+        super().__init__(owner, bone_name, center - radius, center + radius)
+        self.radius = radius
+        self.size = len(self.positions)
+        self.slot_frames = np.full(self.size, np.iinfo(np.int64).min)
+
+    def move(self, center):
+        if center - self.radius == self.frame_start:
+            return False
+        self.frame_start = center - self.radius
+        self.frame_end = center + self.radius
+        self.batch = None
+
+        frames = np.arange(self.frame_start, self.frame_end + 1)
+        missing = frames[self.slot_frames[frames % self.size] != frames]
+        if len(missing):
+            self.mark_dirty(missing[0], missing[-1])
+        return True
+
+    def store(self, frames, positions):
+        frames = np.asarray(frames)
+        self.positions[frames % self.size] = positions
+        self.slot_frames[frames % self.size] = frames
+
+    def ordered_positions(self):
+        return self.positions[np.arange(self.frame_start, self.frame_end + 1) % self.size]
+
+
+def snapshot_keys(action):
+    # (keys, 6) co + handle arrays per channel
+    keys = {}
+    for fc in action.fcurves:
+        points = fc.keyframe_points
+        data = np.empty((3, len(points) * 2))
+        points.foreach_get("co", data[0])
+        points.foreach_get("handle_left", data[1])
+        points.foreach_get("handle_right", data[2])
+        keys[(fc.data_path, fc.array_index)] = np.hstack([d.reshape(-1, 2) for d in data])
+    return keys
+
+
+def changed_key_range(old, new):
+    # Frames between the keys around every added, removed or edited key
+    changed = {row[0] for row in set(map(tuple, old.tolist())) ^ set(map(tuple, new.tolist()))}
+    old_frames = unique_frames(old[:, 0])
+    new_frames = unique_frames(new[:, 0])
+
+    start = math.inf
+    end = -math.inf
+    for frame in changed:
+        for frames in (old_frames, new_frames):
+            prev_frame, next_frame = find_neighbours(frames, int(frame))
+            start = min(start, prev_frame if prev_frame is not None else -math.inf)
+            end = max(end, next_frame if next_frame is not None else math.inf)
+    return start, end
+
+
+_path_sweep_active = False
+
+
+def sweep_frames(scene, frame_paths):
+    # One frame change per frame, reading every path that needs it
+    global _path_sweep_active
+    original_frame = scene.frame_current
+    # The frame changes below must not slide windowed paths
+    _path_sweep_active = True
+    try:
+        for frame in sorted(frame_paths):
+            scene.frame_set(frame)
+            for path in frame_paths[frame]:
+                path.store(frame, path.read_position())
+        scene.frame_set(original_frame)
+    finally:
+        _path_sweep_active = False
+
+
+class MotionPathCache:
+
+    def __init__(self):
+        self.paths = {}
+        self.snapshots = {}
+
+    def clear(self):
+        self.paths.clear()
+        self.snapshots.clear()
+
+    def remove(self, owner, bone_name=None):
+        self.paths.pop((owner.as_pointer(), bone_name), None)
+
+    def calculate(self, scene, targets, frame_start, frame_end, use_fk=False, window=0):
+        if window:
+            frame_start = scene.frame_current - window
+            frame_end = scene.frame_current + window
+        frames = np.arange(frame_start, frame_end + 1)
+        evaluator = FKEvaluator(frames) if use_fk else None
+        swept = []
+        for owner, bone_name in targets:
+            if window:
+                path = WindowedPath(owner, bone_name, scene.frame_current, window)
+            else:
+                path = CachedPath(owner, bone_name, frame_start, frame_end)
+            self.paths[(owner.as_pointer(), bone_name)] = path
+            action = owner.animation_data.action if owner.animation_data else None
+            if action:
+                self.snapshots[action.as_pointer()] = snapshot_keys(action)
+            if evaluator is not None and can_evaluate_fk(owner, bone_name):
+                path.use_fk = True
+                path.store(frames, evaluator.positions(owner, bone_name))
+            else:
+                swept.append(path)
+        if swept:
+            sweep_frames(scene, {frame: swept for frame in range(frame_start, frame_end + 1)})
+
+    def follow(self, center):
+        moved = False
+        for path in self.paths.values():
+            moved |= path.move(center)
+        return moved
+
+    def has_dirty(self):
+        return any(path.dirty is not None for path in self.paths.values())
+
+    def on_action_update(self, action):
+        key = action.as_pointer()
+        old = self.snapshots.get(key)
+        if old is None:
+            return False
+        new = self.snapshots[key] = snapshot_keys(action)
+
+        empty = np.empty((0, 6))
+        changed = []
+        for channel in old.keys() | new.keys():
+            old_keys = old.get(channel, empty)
+            new_keys = new.get(channel, empty)
+            if old_keys.shape == new_keys.shape and np.array_equal(old_keys, new_keys):
+                continue
+            changed.append((parse_bone_name(channel[0]), changed_key_range(old_keys, new_keys)))
+        if not changed:
+            return False
+
+        marked = False
+        for path_key, path in list(self.paths.items()):
+            try:
+                anim = path.owner.animation_data
+                if not anim or anim.action != action:
+                    continue
+                bones = path.get_channel_bones()
+            except (ReferenceError, KeyError):
+                del self.paths[path_key]
+                continue
+            for bone_name, (start, end) in changed:
+                # Object-level curves move every path, bone curves their chain
+                # (or, for frame-stepped paths, anything on the owner)
+                if bone_name is None or bones is None or bone_name in bones:
+                    path.mark_dirty(start, end)
+                    marked = True
+        return marked
+
+    def resolve_owners(self):
+        # After undo/redo: find every path's owner again by name and
+        # re-evaluate it, since the undone step may have changed anything
+        paths = list(self.paths.values())
+        self.paths.clear()
+        self.snapshots.clear()
+        for path in paths:
+            owner = bpy.data.objects.get(path.owner_name)
+            if owner is None or (path.bone_name is not None and
+                                 (owner.pose is None or path.bone_name not in owner.pose.bones)):
+                continue
+            path.owner = owner
+            path.batch = None
+            path.mark_dirty(path.frame_start, path.frame_end)
+            self.paths[(owner.as_pointer(), path.bone_name)] = path
+            action = owner.animation_data.action if owner.animation_data else None
+            if action:
+                self.snapshots[action.as_pointer()] = snapshot_keys(action)
+        return bool(self.paths)
+
+    def refresh(self, scene, sweep=True):
+        # sweep=False only evaluates FK paths and leaves the rest dirty, for
+        # handlers that can't change the frame
+        frame_paths = {}
+        evaluators = {}
+        refreshed = 0
+        for key, path in list(self.paths.items()):
+            if path.dirty is None:
+                continue
+            try:
+                # Re-check: a constraint or driver added since calculating needs stepping
+                path.use_fk = path.use_fk and can_evaluate_fk(path.owner, path.bone_name)
+            except ReferenceError:
+                del self.paths[key]
+                continue
+            if not path.use_fk and not sweep:
+                continue
+
+            start, end = path.dirty
+            path.dirty = None
+            path.batch = None
+            refreshed += end - start + 1
+            if path.use_fk:
+                evaluator = evaluators.get((start, end))
+                if evaluator is None:
+                    evaluator = evaluators[(start, end)] = FKEvaluator(np.arange(start, end + 1))
+                path.store(evaluator.frames, evaluator.positions(path.owner, path.bone_name))
+                continue
+            for frame in range(start, end + 1):
+                frame_paths.setdefault(frame, []).append(path)
+        if frame_paths:
+            sweep_frames(scene, frame_paths)
+        return refreshed
+
+
+_motion_path_cache = MotionPathCache()
+_draw_handle = None
+
+
+def get_path_targets(context):
+    if context.mode == 'POSE':
+        return [(bone.id_data, bone.name) for bone in context.selected_pose_bones or ()]
+    return [(obj, None) for obj in context.selected_objects]
+
+
+def set_targets_selected(targets, select):
+    for owner, bone_name in targets:
+        if bone_name is None:
+            owner.select_set(select)
+        else:
+            owner.pose.bones[bone_name].bone.select = select
+
+
+def get_path_range(scene):
+    if scene.use_preview_range:
+        return scene.frame_preview_start, scene.frame_preview_end
+    return scene.frame_start, scene.frame_end
+
+
+def tag_view3d_redraw():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+# Seconds between checks for the end of playback before sweeping
+PLAYBACK_POLL_TIME = 0.25
+
+
+def is_animation_playing():
+    # Timers run without a window in the context
+    return any(window.screen.is_animation_playing for window in bpy.context.window_manager.windows)
+
+
+def refresh_live_paths():
+    # Timer: re-evaluate dirty frames outside the depsgraph handler.
+    # Sweeping changes the frame twice per dirty frame, a full scene
+    # evaluation each, so it waits until playback stops
+    if is_animation_playing():
+        return PLAYBACK_POLL_TIME
+    if _motion_path_cache.refresh(bpy.context.scene):
+        tag_view3d_redraw()
+    return None
+
+
+@persistent
+def update_live_paths(scene, depsgraph):
+    if not _motion_path_cache.snapshots or not scene.motion_path_settings.use_live_paths:
+        return
+    marked = False
+    for update in depsgraph.updates:
+        action = update.id.original
+        if isinstance(action, bpy.types.Action):
+            marked |= _motion_path_cache.on_action_update(action)
+    if marked and not bpy.app.timers.is_registered(refresh_live_paths):
+        bpy.app.timers.register(refresh_live_paths, first_interval=0.0)
+
+
+@persistent
+def follow_window_paths(scene, depsgraph=None):
+    # Slide windowed paths with the playhead; FK frames are evaluated right
+    # away, frame stepping waits for the timer
+    if _path_sweep_active or not _motion_path_cache.follow(scene.frame_current):
+        return
+    _motion_path_cache.refresh(scene, sweep=False)
+    if _motion_path_cache.has_dirty() and not bpy.app.timers.is_registered(refresh_live_paths):
+        bpy.app.timers.register(refresh_live_paths, first_interval=0.0)
+    tag_view3d_redraw()
+
+
+@persistent
+def clear_live_paths(*args):
+    _motion_path_cache.clear()
+
+
+@persistent
+def resolve_live_paths(*args):
+    # Undo and redo free the owners the paths point at
+    if _motion_path_cache.resolve_owners() and not bpy.app.timers.is_registered(refresh_live_paths):
+        bpy.app.timers.register(refresh_live_paths, first_interval=0.0)
+
+
+def get_path_shader():
+    return gpu.shader.from_builtin('UNIFORM_COLOR' if bpy.app.version >= (4, 0, 0) else '3D_UNIFORM_COLOR')
+
+
+def draw_live_paths():
+    if not _motion_path_cache.paths:
+        return
+    shader = get_path_shader()
+    shader.bind()
+    shader.uniform_float("color", PATH_COLOR)
+    gpu.state.line_width_set(2.0)
+    for path in _motion_path_cache.paths.values():
+        if path.batch is None:
+            path.batch = batch_for_shader(shader, 'LINE_STRIP', {"pos": path.ordered_positions().astype(np.float32)})
+        path.batch.draw(shader)
+    gpu.state.line_width_set(1.0)
+
+
+class MotionPathSettings(PropertyGroup):
+
+    use_live_paths: BoolProperty(
+        name="Live",
+        description="Keep cached motion paths that only recompute the frames around edited keys",
+        default=False)
+
+    use_fk_evaluator: BoolProperty(
+        name="FK",
+        description="Evaluate unconstrained FK paths straight from their F-curves instead of stepping the scene frame",
+        default=False)
+
+    use_window_paths: BoolProperty(
+        name="Window",
+        description="Only calculate frames around the current frame and follow the playhead",
+        default=False)
+
+    path_window: IntProperty(
+        name="Frames",
+        description="Frames calculated before and after the current frame",
+        default=15,
+        min=1,
+        soft_max=200)
+
+
 class MOTIONPATH_OT_calculate(Operator):
     bl_idname = "motionpath.calculate"
     bl_label = "Motion Paths"
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
+        settings = context.scene.motion_path_settings
+        targets = get_path_targets(context)
+        if not targets:
+            self.report({'WARNING'}, "Nothing selected")
+            return {'CANCELLED'}
+        frame_start, frame_end = get_path_range(context.scene)
+
+        if settings.use_window_paths:
+            _motion_path_cache.calculate(context.scene, targets, frame_start, frame_end,
+                                         settings.use_fk_evaluator, settings.path_window)
+            tag_view3d_redraw()
+            self.report({'INFO'}, f"Calculated {len(targets)} windowed motion paths")
+            return {'FINISHED'}
+
+        if settings.use_live_paths:
+            _motion_path_cache.calculate(context.scene, targets, frame_start, frame_end, settings.use_fk_evaluator)
+            tag_view3d_redraw()
+            self.report({'INFO'}, f"Calculated {len(targets)} live motion paths")
+            return {'FINISHED'}
+
+        native = targets
+        if settings.use_fk_evaluator:
+            fk_targets = [target for target in targets if can_evaluate_fk(*target)]
+            _motion_path_cache.calculate(context.scene, fk_targets, frame_start, frame_end, use_fk=True)
+            native = [target for target in targets if target not in fk_targets]
+            tag_view3d_redraw()
+            if not native:
+                self.report({'INFO'}, f"Evaluated {len(fk_targets)} FK motion paths")
+                return {'FINISHED'}
+
+        # Constrained targets fall back to Blender's paths_calculate; hide
+        # the FK ones from it by deselecting them for the call
+        skipped = [target for target in targets if target not in native]
+        set_targets_selected(skipped, False)
+        try:
+            return self.calculate_native(context, native)
+        finally:
+            set_targets_selected(skipped, True)
+
+    def calculate_native(self, context, targets):
         if context.mode == 'POSE':
             try:
                 bpy.ops.pose.paths_calculate()
-            except:
+            except RuntimeError as error:
+                self.report({'ERROR'}, f"Motion paths failed: {error}")
                 return {'CANCELLED'}
-        else:
-            for obj in context.selected_objects:
-                context.view_layer.objects.active = obj
-                try:
-                    bpy.ops.object.paths_calculate()
-                except:
-                    pass
+            return {'FINISHED'}
+
+        selected = [owner for owner, bone_name in targets]
+
+        # paths_calculate covers every selected object in one sweep of the
+        # frame range; it only needs one of them active
+        if context.view_layer.objects.active not in selected:
+            context.view_layer.objects.active = selected[0]
+        try:
+            bpy.ops.object.paths_calculate()
+        except RuntimeError as error:
+            self.report({'ERROR'}, f"Motion paths failed: {error}")
+            return {'CANCELLED'}
 
+        self.report({'INFO'}, f"Calculated motion paths for {len(selected)} objects")
         return {'FINISHED'}
 
 
@@ -162,6 +1331,14 @@ class MOTIONPATH_OT_clear(Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
+        # Cached paths come from live mode or the FK evaluator
+        for owner, bone_name in get_path_targets(context):
+            _motion_path_cache.remove(owner, bone_name)
+        tag_view3d_redraw()
+        settings = context.scene.motion_path_settings
+        if settings.use_live_paths or settings.use_window_paths:
+            return {'FINISHED'}
+
         if context.mode == 'POSE':
             try:
                 bpy.ops.pose.paths_clear()
@@ -182,73 +1359,33 @@ class MOTIONPATH_OT_clear(Operator):
 # AUTO TWEEN
 # =============================================================================
 
-def get_keyframes_around_current(obj, current_frame):
-    if not obj.animation_data or not obj.animation_data.action:
-        return None, None
-
-    keyframes = []
-    for fc in obj.animation_data.action.fcurves:
-        for kp in fc.keyframe_points:
-            frame = int(kp.co[0])
-            if frame not in keyframes:
-                keyframes.append(frame)
-
-    keyframes.sort()
-
-    prev_frame = None
-    next_frame = None
+# Session reused by slider updates while frame, selection and keys stay the same
+_tween_session = None
 
-    for frame in keyframes:
-        if frame < current_frame:
-            prev_frame = frame
-        elif frame > current_frame:
-            next_frame = frame
-            break
-
-    return prev_frame, next_frame
-
-
-def interpolate_object_transforms(obj, prev_frame, next_frame, current_frame, blend_factor):
-    scene = bpy.context.scene
-
-    scene.frame_set(prev_frame)
-    prev_loc = obj.location.copy()
-    prev_rot = obj.rotation_euler.copy() if obj.rotation_mode == 'XYZ' else obj.rotation_quaternion.copy()
-    prev_scale = obj.scale.copy()
 
-    scene.frame_set(next_frame)
-    next_loc = obj.location.copy()
-    next_rot = obj.rotation_euler.copy() if obj.rotation_mode == 'XYZ' else obj.rotation_quaternion.copy()
-    next_scale = obj.scale.copy()
-
-    scene.frame_set(current_frame)
-
-    obj.location = prev_loc.lerp(next_loc, blend_factor)
-
-    if obj.rotation_mode == 'XYZ':
-        obj.rotation_euler = Vector((
-            prev_rot[0] + (next_rot[0] - prev_rot[0]) * blend_factor,
-            prev_rot[1] + (next_rot[1] - prev_rot[1]) * blend_factor,
-            prev_rot[2] + (next_rot[2] - prev_rot[2]) * blend_factor
-        ))
-    else:
-        obj.rotation_quaternion = Quaternion(prev_rot).slerp(Quaternion(next_rot), blend_factor)
+@persistent
+def invalidate_channel_index(scene, depsgraph):
+    for update in depsgraph.updates:
+        action = update.id.original
+        if isinstance(action, bpy.types.Action):
+            _channel_index_cache.pop(action.as_pointer(), None)
 
-    obj.scale = prev_scale.lerp(next_scale, blend_factor)
 
-    obj.keyframe_insert(data_path="location")
-    obj.keyframe_insert(data_path="rotation_euler" if obj.rotation_mode == 'XYZ' else "rotation_quaternion")
-    obj.keyframe_insert(data_path="scale")
+@persistent
+def clear_channel_index(*args):
+    _channel_index_cache.clear()
 
 
 def apply_tween(blend_factor):
+    global _tween_session
     context = bpy.context
-    current_frame = context.scene.frame_current
 
-    for obj in context.selected_objects:
-        prev, next = get_keyframes_around_current(obj, current_frame)
-        if prev and next:
-            interpolate_object_transforms(obj, prev, next, current_frame, blend_factor)
+    # Same engine as the Auto Tween Machine: neighbouring poses are read from
+    # the F-curves once per session and keys are written in bulk
+    if _tween_session is None or not _tween_session.matches(context):
+        _tween_session = BatchedTweenSession(context)
+    _tween_session.blend(blend_factor)
+    _tween_session.commit()
 
 
 class TweenSettings(PropertyGroup):
@@ -301,11 +1438,31 @@ class ANIMATION_PT_fcurve_tools(Panel):
     bl_category = 'Animation'
 
     def draw(self, context):
+        settings = context.scene.fcurve_tool_settings
+        row = self.layout.row(align=True)
+        row.prop(settings, "scope", text="")
+        row.prop(settings, "path_filter", text="", icon='FILTER')
+
         row = self.layout.row(align=True)
         row.operator("graph.set_cycle", text="Cycle")
         row.operator("graph.set_cycle_offset", text="Cycle+")
         row.operator("graph.set_linear", text="Linear")
         row.operator("graph.set_constant", text="Const")
+        row = self.layout.row(align=True)
+        row.operator("graph.clean_channels", text="Clean", icon='BRUSH_DATA')
+        row.operator("graph.unwrap_euler", text="Unwrap Euler", icon='DRIVER_ROTATIONAL_DIFFERENCE')
+
+        row = self.layout.row(align=True)
+        row.operator("graph.profile_fcurves", text="Profile", icon='TIME')
+        row.prop(settings, "profile_count")
+        if settings.profile:
+            box = self.layout.box()
+            col = box.column(align=True)
+            for entry in settings.profile:
+                extras = f", {entry.modifiers} mod" if entry.modifiers else ""
+                col.label(text=f"{entry.cost:.1f} us  {describe_fcurve(entry.data_path, entry.array_index)} "
+                               f"({entry.keys} keys{extras})")
+            box.operator("graph.select_profiled", text="Select for Tools", icon='RESTRICT_SELECT_OFF')
 
 
 class ANIMATION_PT_motion_paths(Panel):
@@ -316,9 +1473,18 @@ class ANIMATION_PT_motion_paths(Panel):
     bl_category = 'Animation'
 
     def draw(self, context):
+        settings = context.scene.motion_path_settings
         row = self.layout.row(align=True)
         row.operator("motionpath.calculate", text="Calc")
         row.operator("motionpath.clear", text="Clear")
+        row.prop(settings, "use_live_paths", toggle=True)
+        row.prop(settings, "use_fk_evaluator", toggle=True)
+
+        row = self.layout.row(align=True)
+        row.prop(settings, "use_window_paths", toggle=True)
+        sub = row.row(align=True)
+        sub.active = settings.use_window_paths
+        sub.prop(settings, "path_window")
 
 
 class ANIMATION_PT_auto_tween(Panel):
@@ -348,6 +1514,13 @@ classes = (
     GRAPH_OT_set_constant,
     GRAPH_OT_set_cycle,
     GRAPH_OT_set_cycle_offset,
+    GRAPH_OT_unwrap_euler,
+    GRAPH_OT_clean_channels,
+    GRAPH_OT_profile_fcurves,
+    GRAPH_OT_select_profiled,
+    FCurveProfileEntry,
+    FCurveToolSettings,
+    MotionPathSettings,
     MOTIONPATH_OT_calculate,
     MOTIONPATH_OT_clear,
     TweenSettings,
@@ -362,13 +1535,57 @@ def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.types.Scene.tween_settings = PointerProperty(type=TweenSettings)
+    bpy.types.Scene.fcurve_tool_settings = PointerProperty(type=FCurveToolSettings)
+    tween_engine.register_handlers(__name__)
+    bpy.app.handlers.depsgraph_update_post.append(invalidate_channel_index)
+    bpy.app.handlers.load_post.append(clear_channel_index)
+    # Undo and redo free the cached F-curves, actions and path owners
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        handlers.append(clear_channel_index)
+        handlers.append(resolve_live_paths)
+
+    global _draw_handle
+    bpy.types.Scene.motion_path_settings = PointerProperty(type=MotionPathSettings)
+    bpy.app.handlers.depsgraph_update_post.append(update_live_paths)
+    bpy.app.handlers.load_post.append(clear_live_paths)
+    bpy.app.handlers.frame_change_post.append(follow_window_paths)
+    _draw_handle = bpy.types.SpaceView3D.draw_handler_add(draw_live_paths, (), 'WINDOW', 'POST_VIEW')
 
 
 def unregister():
+    global _tween_session
+    if invalidate_channel_index in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(invalidate_channel_index)
+    if clear_channel_index in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(clear_channel_index)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        for handler in (clear_channel_index, resolve_live_paths):
+            if handler in handlers:
+                handlers.remove(handler)
+    clear_channel_index()
+    _tween_session = None
+    tween_engine.unregister_handlers(__name__)
+
+    global _draw_handle
+    if _draw_handle is not None:
+        bpy.types.SpaceView3D.draw_handler_remove(_draw_handle, 'WINDOW')
+        _draw_handle = None
+    if update_live_paths in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(update_live_paths)
+    if clear_live_paths in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(clear_live_paths)
+    if follow_window_paths in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.remove(follow_window_paths)
+    if bpy.app.timers.is_registered(refresh_live_paths):
+        bpy.app.timers.unregister(refresh_live_paths)
+    clear_live_paths()
+
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.tween_settings
+    del bpy.types.Scene.fcurve_tool_settings
+    del bpy.types.Scene.motion_path_settings
 
 
 if __name__ == "__main__":
-    register()
\ No newline at end of file
+    register()
@@ -0,0 +1,233 @@
+"""
+F-Curve Batch Runner
+Applies the F-curve tools of blender_animtool_2.py to many .blend files
+from the command line, without opening them in the UI.
+
+The script runs as the coordinator: it spreads the files over a pool of
+background Blender processes (one file per process) and prints a
+per-file timing/result report. Each worker runs this same script with
+--worker, applies the operation to every action in its file and saves it.
+
+Operations:
+    LINEAR, CONSTANT, CYCLE, CYCLE_OFFSET - same as the F-Curve Tools buttons
+    STRIP                                 - remove every F-curve modifier
+
+Usage:
+    blender -b --factory-startup --python fcurve_batch_runner.py -- --op CYCLE shots/**/*.blend
+    blender -b --python fcurve_batch_runner.py -- --op STRIP --jobs 8 --report strip.json --list files.txt
+    python fcurve_batch_runner.py --blender /path/to/blender --op CONSTANT --dry-run shots/*.blend
+
+Keep this file next to blender_animtool_2.py and the modules it imports
+(tween_core.py, tween_engine.py and keyframe_writer.py).
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+OPERATIONS = ('LINEAR', 'CONSTANT', 'CYCLE', 'CYCLE_OFFSET', 'STRIP')
+
+# Workers print their result on one line starting with this
+RESULT_MARKER = "FCURVE_BATCH_RESULT:"
+
+
+def get_script_args():
+    # Blender passes script arguments after "--"
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return [] if bpy is not None else sys.argv[1:]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Apply F-curve tools to many .blend files")
+    parser.add_argument("files", nargs="*", help=".blend files or glob patterns (** is recursive)")
+    parser.add_argument("--op", choices=OPERATIONS, required=True, help="Operation applied to every action")
+    parser.add_argument("--filter", default="",
+                        help="Only F-curves of these properties, e.g. 'location, rotation_euler'")
+    parser.add_argument("--list", help="Text file with one .blend path or pattern per line")
+    parser.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Blender worker processes running at once")
+    parser.add_argument("--blender", help="Blender binary for the workers (default: the running one)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds before a worker is killed")
+    parser.add_argument("--report", help="Write the per-file results to this JSON file")
+    parser.add_argument("--dry-run", action="store_true", help="Apply the operation but don't save the files")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+# ==================== WORKER ====================
+
+def strip_modifiers(fcurves):
+    changed = 0
+    skipped = 0
+    for fcurve in fcurves:
+        if not len(fcurve.modifiers):
+            skipped += 1
+            continue
+        for mod in reversed(list(fcurve.modifiers)):
+            fcurve.modifiers.remove(mod)
+        changed += 1
+    return changed, skipped
+
+
+def run_worker(args):
+    # Runs inside the Blender that opened the file
+    from blender_animtool_2 import parse_path_filter, set_extrapolation
+
+    result = {"file": bpy.data.filepath, "status": "ok", "actions": 0, "fcurves": 0, "changed": 0, "skipped": 0}
+    start = time.perf_counter()
+    try:
+        allowed = parse_path_filter(args.filter)
+        fcurves = []
+        for action in bpy.data.actions:
+            if action.library is not None:
+                continue
+            result["actions"] += 1
+            fcurves.extend(fc for fc in action.fcurves
+                           if not allowed or fc.data_path.rsplit(".", 1)[-1] in allowed)
+        result["fcurves"] = len(fcurves)
+
+        if args.op == 'STRIP':
+            changed, skipped = strip_modifiers(fcurves)
+        else:
+            changed, skipped = set_extrapolation(fcurves, args.op)
+        result["changed"] = changed
+        result["skipped"] = skipped
+
+        if changed and not args.dry_run:
+            bpy.ops.wm.save_mainfile()
+            result["saved"] = True
+    except Exception as error:
+        result["status"] = "error"
+        result["error"] = f"{type(error).__name__}: {error}"
+
+    result["op_seconds"] = time.perf_counter() - start
+    print(RESULT_MARKER + json.dumps(result), flush=True)
+
+
+# ==================== COORDINATOR ====================
+
+def collect_files(args):
+    patterns = list(args.files)
+    if args.list:
+        with open(args.list, encoding="utf-8") as handle:
+            patterns.extend(line.strip() for line in handle if line.strip() and not line.startswith("#"))
+
+    files = []
+    seen = set()
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern, recursive=True)) or [pattern]:
+            path = os.path.abspath(path)
+            if path.endswith(".blend") and path not in seen:
+                seen.add(path)
+                files.append(path)
+    return files
+
+
+def get_blender_binary(args):
+    if args.blender:
+        return args.blender
+    if bpy is not None and bpy.app.binary_path:
+        return bpy.app.binary_path
+    return "blender"
+
+
+def run_file(blender, path, args):
+    command = [blender, "-b", "--factory-startup", path, "--python", os.path.abspath(__file__),
+               "--", "--worker", "--op", args.op, "--filter", args.filter]
+    if args.dry_run:
+        command.append("--dry-run")
+
+    start = time.perf_counter()
+    try:
+        process = subprocess.run(command, capture_output=True, text=True, timeout=args.timeout)
+    except subprocess.TimeoutExpired:
+        return {"file": path, "status": "timeout", "seconds": time.perf_counter() - start}
+    except OSError as error:
+        return {"file": path, "status": "error", "error": str(error), "seconds": 0.0}
+
+    result = None
+    for line in process.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+    if result is None:
+        # Crashed or couldn't open the file - keep the tail of its output
+        tail = (process.stderr or process.stdout).strip().splitlines()[-3:]
+        result = {"status": "failed", "error": " | ".join(tail), "returncode": process.returncode}
+    result["file"] = path
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def print_result(result, done, total):
+    name = os.path.basename(result["file"])
+    if result["status"] == "ok":
+        print(f"[{done}/{total}] {name}: {result['changed']} changed, {result['skipped']} already set "
+              f"({result['actions']} actions) in {result['seconds']:.1f}s", flush=True)
+    else:
+        print(f"[{done}/{total}] {name}: {result['status'].upper()} {result.get('error', '')}", flush=True)
+
+
+def print_summary(results, seconds):
+    failed = [result for result in results if result["status"] != "ok"]
+    changed = sum(result.get("changed", 0) for result in results)
+    print("-" * 60)
+    print(f"{len(results)} files, {changed} F-curves changed, {len(failed)} failed in {seconds:.1f}s")
+    for result in failed:
+        print(f"  {result['status'].upper()}: {result['file']}")
+
+
+def run_batch(args):
+    files = collect_files(args)
+    if not files:
+        print("No .blend files found")
+        return 1
+
+    blender = get_blender_binary(args)
+    jobs = max(1, min(args.jobs, len(files)))
+    print(f"{args.op} on {len(files)} files with {jobs} Blender workers", flush=True)
+
+    start = time.perf_counter()
+    results = []
+    # Threads only wait on the worker processes
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_file, blender, path, args) for path in files]
+        for future in as_completed(futures):
+            results.append(future.result())
+            print_result(results[-1], len(results), len(files))
+    seconds = time.perf_counter() - start
+
+    results.sort(key=lambda result: result["file"])
+    print_summary(results, seconds)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as handle:
+            json.dump({"op": args.op, "filter": args.filter, "dry_run": args.dry_run,
+                       "seconds": seconds, "files": results}, handle, indent=2)
+        print(f"Report written to {args.report}")
+    return 1 if any(result["status"] != "ok" for result in results) else 0
+
+
+def main():
+    args = parse_args(get_script_args())
+    if args.worker:
+        run_worker(args)
+        return 0
+    return run_batch(args)
+
+
+if __name__ == "__main__":
+    status = main()
+    if status:
+        sys.exit(status)
@@ -0,0 +1,97 @@
+"""
+Keyframe Writer
+Bulk key writes shared by tween_engine.py (both tween add-ons) and
+playblast_align_cursor_tool.py: keys are queued per F-curve and written
+with one foreach_set per property instead of one keyframe_insert per key.
+
+The tween engine and the playblast tool subclass KeyframeWriter to queue
+their own channels.
+Keep this file next to the add-ons that import it, with tween_core.py.
+"""
+
+import bpy
+import numpy as np
+
+from tween_core import merge_keys
+
+
+class KeyframeWriter:
+    """Collects key writes and applies them with one bulk write per F-curve"""
+
+    def __init__(self):
+        self.pending = {}
+
+    def add(self, action, data_path, index, frame, value, group=""):
+        """Queue a key of value at frame on one channel of action"""
+        key = (action.as_pointer(), data_path, index)
+        entry = self.pending.get(key)
+        if entry is None:
+            entry = self.pending[key] = (action, data_path, index, group, {})
+        entry[4][float(frame)] = value
+
+    def add_frames(self, action, data_path, index, frames, values, group=""):
+        """Queue keys on several frames of one channel of action"""
+        key = (action.as_pointer(), data_path, index)
+        entry = self.pending.get(key)
+        if entry is None:
+            entry = self.pending[key] = (action, data_path, index, group, {})
+        entry[4].update(zip(map(float, frames), values))
+
+    def flush(self):
+        """Insert or replace all queued keys, updating each F-curve once"""
+        for action, data_path, index, group, keys in self.pending.values():
+            fcurve = self.get_fcurve(action, data_path, index, group)
+            write_fcurve_keys(fcurve, keys)
+        count = len(self.pending)
+        self.pending.clear()
+        return count
+
+    def get_fcurve(self, action, data_path, index, group):
+        """F-curve of a channel, created in group when the action doesn't have it"""
+        fcurve = action.fcurves.find(data_path, index=index)
+        if fcurve is None:
+            fcurve = action.fcurves.new(data_path, index=index, action_group=group)
+        return fcurve
+
+
+def write_fcurve_keys(fcurve, keys):
+    """Insert or replace {frame: value} keys on an F-curve with foreach_set"""
+    points = fcurve.keyframe_points
+    count = len(points)
+    co = np.empty(count * 2)
+    handle_left = np.empty(count * 2)
+    handle_right = np.empty(count * 2)
+    points.foreach_get("co", co)
+    points.foreach_get("handle_left", handle_left)
+    points.foreach_get("handle_right", handle_right)
+
+    frames = np.fromiter(keys.keys(), dtype=np.float64, count=len(keys))
+    values = np.fromiter(keys.values(), dtype=np.float64, count=len(keys))
+    co, handle_left, handle_right, added = merge_keys(
+        co.reshape(-1, 2), handle_left.reshape(-1, 2), handle_right.reshape(-1, 2), frames, values)
+
+    # New keys are appended; update() sorts them in and recalculates auto handles
+    if added:
+        points.add(added)
+
+    points.foreach_set("co", co.ravel())
+    points.foreach_set("handle_left", handle_left.ravel())
+    points.foreach_set("handle_right", handle_right.ravel())
+    if added:
+        set_new_key_settings(points, count)
+    fcurve.update()
+
+
+def set_new_key_settings(points, first):
+    """Give keys made by keyframe_points.add() the user's new-key settings"""
+    # add() always makes auto-clamped BEZIER keyframes, keyframe_insert
+    # follows the preferences and the key type picked in the timeline
+    edit = bpy.context.preferences.edit
+    interpolation = edit.keyframe_new_interpolation_type
+    handle_type = edit.keyframe_new_handle_type
+    key_type = bpy.context.scene.tool_settings.keyframe_type
+    for point in points[first:]:
+        point.interpolation = interpolation
+        point.handle_left_type = handle_type
+        point.handle_right_type = handle_type
+        point.type = key_type
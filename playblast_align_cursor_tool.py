@@ -14,6 +14,38 @@ import bpy
 import os
 from mathutils import Matrix
 
+# Shared bulk key writer (keyframe_writer.py next to this add-on)
+import keyframe_writer
+
+
+# =============================================================================
+# KEYFRAME WRITER
+# =============================================================================
+
+class KeyframeWriter(keyframe_writer.KeyframeWriter):
+    """Bulk key writer that also queues whole transform channels"""
+
+    def add_channels(self, target, action, data_paths, frame):
+        # Pose bones key 'pose.bones["name"].<path>' grouped under the bone name
+        if isinstance(target, bpy.types.PoseBone):
+            prefix = target.path_from_id() + "."
+            group = target.name
+        else:
+            prefix = ""
+            group = "Object Transforms"
+
+        for data_path in data_paths:
+            for index, value in enumerate(getattr(target, data_path)):
+                self.add(action, prefix + data_path, index, frame, value, group)
+
+
+def get_or_create_action(obj):
+    if not obj.animation_data:
+        obj.animation_data_create()
+    if not obj.animation_data.action:
+        obj.animation_data.action = bpy.data.actions.new(name=obj.name + "Action")
+    return obj.animation_data.action
+
 
 # =============================================================================
 # CURSOR TOOLS OPERATORS
@@ -64,6 +96,7 @@ class OBJECT_OT_snap_to_cursor_with_keyframe(bpy.types.Operator):
         frame = context.scene.frame_current
         cursor_loc = context.scene.cursor.location.copy()
         cursor_rot = context.scene.cursor.rotation_quaternion.copy()
+        writer = KeyframeWriter()
         
         if obj.mode == 'POSE':
             bone = context.active_pose_bone
@@ -77,8 +110,7 @@ class OBJECT_OT_snap_to_cursor_with_keyframe(bpy.types.Operator):
             bone.matrix = parent_matrix_inv @ new_matrix
             
             # Insert keyframes at current frame
-            bone.keyframe_insert(data_path="location", frame=frame)
-            bone.keyframe_insert(data_path="rotation_quaternion", frame=frame)
+            writer.add_channels(bone, get_or_create_action(obj), ("location", "rotation_quaternion"), frame)
         
         else:
             # Object Mode
@@ -87,9 +119,9 @@ class OBJECT_OT_snap_to_cursor_with_keyframe(bpy.types.Operator):
             obj.rotation_quaternion = cursor_rot
             
             # Insert keyframes at current frame
-            obj.keyframe_insert(data_path="location", frame=frame)
-            obj.keyframe_insert(data_path="rotation_quaternion", frame=frame)
+            writer.add_channels(obj, get_or_create_action(obj), ("location", "rotation_quaternion"), frame)
         
+        writer.flush()
         return {'FINISHED'}
 
 
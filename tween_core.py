@@ -0,0 +1,212 @@
+"""
+Tween Core
+Keyframe search, blend math and curve sampling shared by the tween add-ons
+(tweenmachine_with_UI_02.py and blender_animtool_2.py).
+
+Works on plain lists and NumPy arrays only - no bpy - so it can be
+benchmarked and checked outside Blender (see benchmarks/bench_tween_core.py).
+Keep this file next to the add-ons that import it.
+"""
+
+import bisect
+import re
+
+import numpy as np
+
+
+# ==================== KEYFRAME SEARCH ====================
+
+# Bone name addressed by a 'pose.bones["..."]' data_path
+BONE_PATH_PATTERN = re.compile(r'^pose\.bones\["((?:[^"\\]|\\.)*)"\]')
+ESCAPE_PATTERN = re.compile(r'\\(.)')
+
+
+def parse_bone_name(data_path):
+    """Bone name addressed by a pose bone data_path, or None for other paths"""
+    match = BONE_PATH_PATTERN.match(data_path)
+    if match is None:
+        return None
+    return ESCAPE_PATTERN.sub(r'\1', match.group(1))
+
+
+def unique_frames(key_frames):
+    """Sorted, de-duplicated integer frames from an array of key frame positions"""
+    if not len(key_frames):
+        return []
+    # Truncate like int() so sub-frame keys land on the frame they start in
+    return np.unique(np.asarray(key_frames, dtype=np.float64).astype(np.int64)).tolist()
+
+
+def insert_frame(frames, frame):
+    """Insert frame into a sorted frame list unless it is already there"""
+    index = bisect.bisect_left(frames, frame)
+    if index == len(frames) or frames[index] != frame:
+        frames.insert(index, frame)
+
+
+def find_neighbours(frames, current_frame):
+    """Find the frames directly before and after current frame in a sorted list"""
+    index = bisect.bisect_left(frames, current_frame)
+    prev_frame = frames[index - 1] if index > 0 else None
+
+    index = bisect.bisect_right(frames, current_frame, index)
+    next_frame = frames[index] if index < len(frames) else None
+
+    return prev_frame, next_frame
+
+
+def sample_keys(key_frames, key_values, frames):
+    """Values of keys sitting exactly on frames, plus a mask of the frames that have one"""
+    frames = np.asarray(frames, dtype=np.float64)
+    if not len(key_frames):
+        return np.zeros(len(frames)), np.zeros(len(frames), dtype=bool)
+
+    found = np.minimum(np.searchsorted(key_frames, frames), len(key_frames) - 1)
+    exists = key_frames[found] == frames
+    return np.where(exists, key_values[found], 0.0), exists
+
+
+def merge_keys(co, handle_left, handle_right, frames, values):
+    """Insert or replace keys in (N, 2) keyframe arrays
+
+    Keys already on a frame get the new value and their handles move with
+    them. New keys are appended with handles on the key, unsorted - the
+    caller sorts them in (fcurve.update() in Blender). Returns the new
+    co, handle_left and handle_right arrays and the number of added keys.
+    """
+    count = len(co)
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+
+    found = np.minimum(np.searchsorted(co[:, 0], frames), max(count - 1, 0))
+    exists = (co[found, 0] == frames) if count else np.zeros(len(frames), dtype=bool)
+    rows = found[exists]
+    delta = values[exists] - co[rows, 1]
+    co[rows, 1] = values[exists]
+    handle_left[rows, 1] += delta
+    handle_right[rows, 1] += delta
+
+    added = np.column_stack((frames[~exists], values[~exists]))
+    if len(added):
+        co = np.concatenate((co, added))
+        handle_left = np.concatenate((handle_left, added))
+        handle_right = np.concatenate((handle_right, added))
+
+    return co, handle_left, handle_right, len(added)
+
+
+# ==================== BLEND MATH ====================
+
+def lerp_arrays(prev_values, next_values, blend_factor):
+    """Linear blend of two arrays of vectors"""
+    return prev_values + (next_values - prev_values) * blend_factor
+
+
+def slerp_quaternion_arrays(prev_quats, next_quats, blend_factor):
+    """Spherical blend of two (N, 4) quaternion arrays, taking the shorter arc
+
+    blend_factor is a scalar or an (N,) array with one factor per row.
+    """
+    dot = np.einsum("ij,ij->i", prev_quats, next_quats)
+
+    # Hemisphere correction - flip quaternions that point away
+    next_quats = np.where((dot < 0.0)[:, None], -next_quats, next_quats)
+    dot = np.minimum(np.abs(dot), 1.0)
+
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    nearly_equal = sin_theta < 1e-6
+    safe_sin = np.where(nearly_equal, 1.0, sin_theta)
+
+    prev_weight = np.where(nearly_equal, 1.0 - blend_factor, np.sin((1.0 - blend_factor) * theta) / safe_sin)
+    next_weight = np.where(nearly_equal, blend_factor, np.sin(blend_factor * theta) / safe_sin)
+
+    result = prev_weight[:, None] * prev_quats + next_weight[:, None] * next_quats
+    return result / np.linalg.norm(result, axis=1)[:, None]
+
+
+def ease_in_out(position):
+    """Smoothstep blend curve - slow out of the previous key and into the next"""
+    return position * position * (3.0 - 2.0 * position)
+
+
+def gap_positions(prev_frame, next_frame):
+    """Frames strictly between two keys and their 0-1 position in the gap"""
+    frames = np.arange(prev_frame + 1, next_frame, dtype=np.float64)
+    return frames, (frames - prev_frame) / (next_frame - prev_frame)
+
+
+# ==================== CURVE SAMPLING ====================
+
+# Segment interpolation codes for evaluate_keys
+INTERPOLATION_CONSTANT = 0
+INTERPOLATION_LINEAR = 1
+INTERPOLATION_BEZIER = 2
+
+# Bisection steps when solving a bezier segment for its curve parameter
+BEZIER_ITERATIONS = 24
+
+
+def bezier_point(p0, p1, p2, p3, t):
+    """Cubic bezier coordinate at parameter t"""
+    u = 1.0 - t
+    return u * u * u * p0 + 3.0 * u * u * t * p1 + 3.0 * u * t * t * p2 + t * t * t * p3
+
+
+def evaluate_keys(co, handle_left, handle_right, interpolation, frames):
+    """Values of a keyed curve at frames, with constant extrapolation
+
+    co and the handles are sorted (N, 2) keyframe arrays and interpolation
+    holds one INTERPOLATION_* code per key for the segment starting on it.
+    Bezier handles are shortened to fit their segment like Blender does,
+    which keeps each segment's x monotonic so it can be solved by bisection.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.empty(len(frames))
+    if not len(co):
+        values.fill(0.0)
+        return values
+
+    before = frames <= co[0, 0]
+    after = frames >= co[-1, 0]
+    values[before] = co[0, 1]
+    values[after] = co[-1, 1]
+    inside = ~(before | after)
+    if not inside.any():
+        return values
+
+    x = frames[inside]
+    segment = np.searchsorted(co[:, 0], x, side="right") - 1
+    start = co[segment]
+    end = co[segment + 1]
+    mode = np.asarray(interpolation)[segment]
+    result = np.where(mode == INTERPOLATION_CONSTANT, start[:, 1],
+                      start[:, 1] + (end[:, 1] - start[:, 1]) * (x - start[:, 0]) / (end[:, 0] - start[:, 0]))
+
+    bezier = mode == INTERPOLATION_BEZIER
+    if bezier.any():
+        rows = segment[bezier]
+        x = x[bezier]
+        p0 = co[rows]
+        p3 = co[rows + 1]
+        reach_out = handle_right[rows] - p0
+        reach_in = handle_left[rows + 1] - p3
+
+        length = p3[:, 0] - p0[:, 0]
+        reach = np.abs(reach_out[:, 0]) + np.abs(reach_in[:, 0])
+        scale = np.where(reach > length, length / np.where(reach > 0.0, reach, 1.0), 1.0)[:, None]
+        p1 = p0 + reach_out * scale
+        p2 = p3 + reach_in * scale
+
+        low = np.zeros(len(x))
+        high = np.ones(len(x))
+        for _ in range(BEZIER_ITERATIONS):
+            t = (low + high) * 0.5
+            below = bezier_point(p0[:, 0], p1[:, 0], p2[:, 0], p3[:, 0], t) < x
+            low = np.where(below, t, low)
+            high = np.where(below, high, t)
+        t = (low + high) * 0.5
+        result[bezier] = bezier_point(p0[:, 1], p1[:, 1], p2[:, 1], p3[:, 1], t)
+
+    values[inside] = result
+    return values
@@ -0,0 +1,580 @@
+"""
+Tween Engine
+Key search, pose sampling and blending shared by the tween add-ons
+(tweenmachine_with_UI_02.py and blender_animtool_2.py): neighbouring keys
+come from a cached per-action key index, poses are read from the F-curves
+where possible and tweens are keyed in bulk through keyframe_writer.
+
+The add-ons pass their own settings into the sessions and register the
+engine's handlers with register_handlers()/unregister_handlers().
+Keep this file next to the add-ons that import it, with tween_core.py and
+keyframe_writer.py.
+"""
+
+import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+from mathutils import Vector, Quaternion
+
+from tween_core import (
+    parse_bone_name, unique_frames, insert_frame, find_neighbours, sample_keys,
+    lerp_arrays, slerp_quaternion_arrays,
+)
+import keyframe_writer
+
+
+# Sorted key frames per action, keyed by action pointer
+_keyframe_index_cache = {}
+
+
+# Actions keyed by the tween itself since the last depsgraph update
+_own_key_writes = set()
+
+# Bumped whenever cached indices are dropped for key edits made outside the
+# tween, so sessions captured before them stop matching
+_key_index_generation = 0
+
+# Add-ons that registered the engine's handlers
+_handler_users = set()
+
+
+def get_fcurve_frames(fcurves):
+    """Sorted, de-duplicated key frames of a group of F-curves"""
+    key_frames = []
+    for fcurve in fcurves:
+        points = fcurve.keyframe_points
+        co = np.empty(len(points) * 2)
+        points.foreach_get("co", co)
+        key_frames.append(co[0::2])
+    return unique_frames(np.concatenate(key_frames)) if key_frames else []
+
+
+class ActionKeyIndex:
+    """Sorted key frames of one action, for the whole action and per bone"""
+
+    def __init__(self, action):
+        self.action = action
+        self.fcurve_count = len(action.fcurves)
+        self._frames = None
+        self._bone_fcurves = None
+        self._bone_frames = {}
+        self._channels = None
+
+    @property
+    def frames(self):
+        """Key frames of every F-curve in the action"""
+        if self._frames is None:
+            self._frames = get_fcurve_frames(self.action.fcurves)
+        return self._frames
+
+    @property
+    def bone_fcurves(self):
+        """F-curves grouped by the bone name in their data_path, parsed once"""
+        if self._bone_fcurves is None:
+            groups = {}
+            for fcurve in self.action.fcurves:
+                name = parse_bone_name(fcurve.data_path)
+                if name is not None:
+                    groups.setdefault(name, []).append(fcurve)
+            self._bone_fcurves = groups
+        return self._bone_fcurves
+
+    def find_fcurve(self, data_path, array_index):
+        """Look up an F-curve by data_path and array index in a map built once"""
+        if self._channels is None:
+            self._channels = {(fcurve.data_path, fcurve.array_index): fcurve for fcurve in self.action.fcurves}
+        return self._channels.get((data_path, array_index))
+
+    def get_bone_frames(self, bone_name):
+        """Key frames of one bone's own F-curves"""
+        frames = self._bone_frames.get(bone_name)
+        if frames is None:
+            frames = get_fcurve_frames(self.bone_fcurves.get(bone_name, ()))
+            self._bone_frames[bone_name] = frames
+        return frames
+
+    def add_frame(self, frame, bone_name=None):
+        """Record a key written at frame without rescanning the action"""
+        if self._frames is not None:
+            insert_frame(self._frames, frame)
+        if bone_name in self._bone_frames:
+            insert_frame(self._bone_frames[bone_name], frame)
+
+    def neighbours(self, current_frame, bone_name=None):
+        """Find the key frames directly before and after current frame"""
+        if bone_name is None:
+            return find_neighbours(self.frames, current_frame)
+        return find_neighbours(self.get_bone_frames(bone_name), current_frame)
+
+
+def get_action_key_index(action):
+    """Get the cached key index of an action, building it on first use"""
+    key = action.as_pointer()
+    index = _keyframe_index_cache.get(key)
+    if index is None:
+        index = _keyframe_index_cache[key] = ActionKeyIndex(action)
+    return index
+
+
+def mark_own_key_write(action, frame, bone_name=None):
+    """Keep the cached index valid after the tween keyed action at frame"""
+    key = action.as_pointer()
+    index = get_action_key_index(action)
+    if index.fcurve_count != len(action.fcurves):
+        # Keying created new channels - let the next lookup regroup them
+        _keyframe_index_cache.pop(key, None)
+    else:
+        index.add_frame(frame, bone_name)
+    _own_key_writes.add(key)
+
+
+@persistent
+def invalidate_keyframe_index(scene, depsgraph):
+    """Drop cached key indices of actions whose keys changed"""
+    global _key_index_generation
+    for update in depsgraph.updates:
+        action = update.id.original
+        if not isinstance(action, bpy.types.Action):
+            continue
+        key = action.as_pointer()
+        if key not in _own_key_writes:
+            _keyframe_index_cache.pop(key, None)
+            _key_index_generation += 1
+    _own_key_writes.clear()
+
+
+@persistent
+def clear_keyframe_index(*args):
+    """Drop all cached key indices when a file is loaded or undo/redo replaces the data"""
+    global _key_index_generation
+    _keyframe_index_cache.clear()
+    _own_key_writes.clear()
+    _key_index_generation += 1
+
+
+# Engine handlers, shared by every add-on that registers them
+HANDLERS = (
+    ("depsgraph_update_post", invalidate_keyframe_index),
+    ("load_post", clear_keyframe_index),
+    # Undo and redo free the cached F-curves and actions
+    ("undo_post", clear_keyframe_index),
+    ("redo_post", clear_keyframe_index),
+)
+
+
+def register_handlers(user):
+    """Keep cached key indices in sync with key edits while add-on user is enabled"""
+    if not _handler_users:
+        for name, handler in HANDLERS:
+            handlers = getattr(bpy.app.handlers, name)
+            if handler not in handlers:
+                handlers.append(handler)
+    _handler_users.add(user)
+
+
+def unregister_handlers(user):
+    """Release the handlers for add-on user, removing them when no add-on needs them"""
+    _handler_users.discard(user)
+    if _handler_users:
+        return
+    for name, handler in HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if handler in handlers:
+            handlers.remove(handler)
+    clear_keyframe_index()
+
+
+TRANSFORM_PATHS = ("location", "rotation_euler", "rotation_quaternion", "scale")
+
+
+def get_rotation_path(target):
+    """Rotation channel the tween reads and keys for an object or pose bone"""
+    return "rotation_euler" if target.rotation_mode == 'XYZ' else "rotation_quaternion"
+
+
+def get_data_path_prefix(target):
+    """Action data_path prefix of an object ('') or pose bone ('pose.bones["name"].')"""
+    if isinstance(target, bpy.types.PoseBone):
+        return target.path_from_id() + "."
+    return ""
+
+
+def get_driven_paths(owner):
+    """Driven data_paths of an owner whose action can be read directly, None if it can't"""
+    anim = owner.animation_data
+    if not anim or not anim.action:
+        return None
+
+    # NLA layering changes the evaluated value away from the active action
+    if anim.use_tweak_mode:
+        return None
+    if anim.use_nla and any(not track.mute for track in anim.nla_tracks):
+        return None
+
+    return {driver.data_path for driver in anim.drivers}
+
+
+def can_evaluate_fcurves(target, driven_paths):
+    """Check if the target's transform channels are exactly its action's F-curves"""
+    if driven_paths is None:
+        return False
+
+    # Only plain FK channels - constrained targets go through the scene
+    if target.constraints:
+        return False
+
+    # Driven channels are not stored in the action
+    prefix = get_data_path_prefix(target)
+    return not any(prefix + path in driven_paths for path in TRANSFORM_PATHS)
+
+
+def find_active_fcurve(key_index, data_path, index):
+    """F-curve of a channel, or None if it is missing or muted (directly or by its group)"""
+    fcurve = key_index.find_fcurve(data_path, index)
+    if fcurve is None or fcurve.mute or (fcurve.group and fcurve.group.mute):
+        return None
+    return fcurve
+
+
+def sample_transforms_from_fcurves(target, action, frame):
+    """Get location, rotation and scale at a frame by evaluating the action's F-curves"""
+    prefix = get_data_path_prefix(target)
+    rotation_path = get_rotation_path(target)
+    key_index = get_action_key_index(action)
+
+    channels = []
+    for data_path in ("location", rotation_path, "scale"):
+        current = getattr(target, data_path)
+        values = []
+        for index in range(len(current)):
+            fcurve = find_active_fcurve(key_index, prefix + data_path, index)
+            # Unkeyed or muted channels keep their current value, same as after a frame change
+            values.append(fcurve.evaluate(frame) if fcurve else current[index])
+        channels.append(values)
+
+    loc, rot, scale = channels
+    rot = Vector(rot) if rotation_path == "rotation_euler" else Quaternion(rot)
+    return Vector(loc), rot, Vector(scale)
+
+
+def sample_transforms_from_keys(target, action, frames):
+    """Get transforms at key frames from keyframe data pulled with foreach_get"""
+    prefix = get_data_path_prefix(target)
+    rotation_path = get_rotation_path(target)
+    key_index = get_action_key_index(action)
+    frames = np.asarray(frames, dtype=np.float64)
+
+    channels = []
+    for data_path in ("location", rotation_path, "scale"):
+        current = getattr(target, data_path)
+        values = np.empty((len(frames), len(current)))
+        for index in range(len(current)):
+            fcurve = find_active_fcurve(key_index, prefix + data_path, index)
+            if fcurve is None:
+                values[:, index] = current[index]
+                continue
+
+            points = fcurve.keyframe_points
+            co = np.empty(len(points) * 2)
+            points.foreach_get("co", co)
+
+            # Take the key value where the curve has a key, evaluate elsewhere
+            values[:, index], exists = sample_keys(co[0::2], co[1::2], frames)
+            for row in np.flatnonzero(~exists):
+                values[row, index] = fcurve.evaluate(frames[row])
+        channels.append(values)
+
+    loc, rot, scale = channels
+    rot_type = Vector if rotation_path == "rotation_euler" else Quaternion
+    return [(Vector(loc[row]), rot_type(rot[row]), Vector(scale[row])) for row in range(len(frames))]
+
+
+def read_transforms(target):
+    """Copy the target's current location, rotation and scale"""
+    loc = target.location.copy()
+    rot = target.rotation_euler.copy() if target.rotation_mode == 'XYZ' else target.rotation_quaternion.copy()
+    scale = target.scale.copy()
+    return loc, rot, scale
+
+
+def set_transforms(target, transforms):
+    """Set location, rotation and scale read with read_transforms"""
+    loc, rot, scale = transforms
+    target.location = loc
+    if target.rotation_mode == 'XYZ':
+        target.rotation_euler = rot
+    else:
+        target.rotation_quaternion = rot
+    target.scale = scale
+
+
+def set_blended_transforms(target, prev_transforms, next_transforms, blend_factor):
+    """Set transforms blended between two sampled poses, without keying them"""
+    prev_loc, prev_rot, prev_scale = prev_transforms
+    next_loc, next_rot, next_scale = next_transforms
+
+    # Interpolate location
+    target.location = prev_loc.lerp(next_loc, blend_factor)
+
+    # Interpolate rotation
+    if target.rotation_mode == 'XYZ':
+        # Euler rotation
+        target.rotation_euler = Vector((
+            prev_rot[0] + (next_rot[0] - prev_rot[0]) * blend_factor,
+            prev_rot[1] + (next_rot[1] - prev_rot[1]) * blend_factor,
+            prev_rot[2] + (next_rot[2] - prev_rot[2]) * blend_factor
+        ))
+    else:
+        # Quaternion rotation
+        target.rotation_quaternion = Quaternion(prev_rot).slerp(Quaternion(next_rot), blend_factor)
+
+    # Interpolate scale
+    target.scale = prev_scale.lerp(next_scale, blend_factor)
+
+
+class KeyframeWriter(keyframe_writer.KeyframeWriter):
+    """Bulk key writer for tween transforms, looking channels up in the key index"""
+
+    def add_transforms(self, target, action, frame, transforms=None):
+        """Queue location, rotation and scale keys of an object or pose bone"""
+        if transforms is None:
+            transforms = read_transforms(target)
+        prefix = get_data_path_prefix(target)
+        group = target.name if prefix else "Object Transforms"
+
+        paths = ("location", get_rotation_path(target), "scale")
+        for data_path, values in zip(paths, transforms):
+            for index, value in enumerate(values):
+                self.add(action, prefix + data_path, index, frame, value, group)
+
+    def add_transform_frames(self, target, action, frames, loc, rot, scale):
+        """Queue transform keys on several frames from (frames, size) value arrays"""
+        prefix = get_data_path_prefix(target)
+        group = target.name if prefix else "Object Transforms"
+
+        paths = ("location", get_rotation_path(target), "scale")
+        for data_path, values in zip(paths, (loc, rot, scale)):
+            for index in range(values.shape[1]):
+                self.add_frames(action, prefix + data_path, index, frames, values[:, index], group)
+
+    def get_fcurve(self, action, data_path, index, group):
+        fcurve = get_action_key_index(action).find_fcurve(data_path, index)
+        if fcurve is None:
+            # Channels created during this flush are not in the cached map yet
+            fcurve = super().get_fcurve(action, data_path, index, group)
+        return fcurve
+
+
+def get_tween_candidates(context):
+    """Selected pose bones (pose mode) or objects, grouped by their animated owner"""
+    if context.mode == 'POSE' and context.selected_pose_bones:
+        # Multi-object pose mode - every bone belongs to its own armature
+        groups = {}
+        for bone in context.selected_pose_bones:
+            armature = bone.id_data
+            groups.setdefault(armature.as_pointer(), (armature, []))[1].append(bone)
+        return list(groups.values())
+    return [(obj, [obj]) for obj in context.selected_objects]
+
+
+class TweenTarget:
+    """An object or pose bone with its poses at the surrounding keyframes"""
+
+    def __init__(self, target, owner, prev_frame, next_frame):
+        self.target = target
+        self.owner = owner
+        self.bone_name = target.name if isinstance(target, bpy.types.PoseBone) else None
+        self.prev_frame = prev_frame
+        self.next_frame = next_frame
+        self.prev_transforms = None
+        self.next_transforms = None
+        self.original_transforms = read_transforms(target)
+
+
+class TweenSession:
+    """Tween targets with their neighbouring poses captured once, then blended many times"""
+
+    def __init__(self, context, use_fcurves=True):
+        scene = context.scene
+        self.frame = scene.frame_current
+        self.use_fcurves = use_fcurves
+        self.key = self.get_key(context)
+
+        self.targets = []
+        scene_samples = {}
+        for owner, targets in get_tween_candidates(context):
+            if not owner.animation_data or not owner.animation_data.action:
+                continue
+
+            # Armatures that share an action share one cached key index
+            action = owner.animation_data.action
+            key_index = get_action_key_index(action)
+            driven_paths = get_driven_paths(owner) if use_fcurves else None
+
+            for target in targets:
+                bone_name = target.name if isinstance(target, bpy.types.PoseBone) else None
+                prev_frame, next_frame = key_index.neighbours(self.frame, bone_name)
+                if prev_frame is None or next_frame is None:
+                    continue
+
+                item = TweenTarget(target, owner, prev_frame, next_frame)
+                if can_evaluate_fcurves(target, driven_paths):
+                    item.prev_transforms, item.next_transforms = self.sample_fcurves(target, action, prev_frame, next_frame)
+                else:
+                    scene_samples.setdefault(prev_frame, []).append((item, "prev_transforms"))
+                    scene_samples.setdefault(next_frame, []).append((item, "next_transforms"))
+                self.targets.append(item)
+
+        # Fallback targets share a single frame change per neighbouring frame
+        if scene_samples:
+            for frame in sorted(scene_samples):
+                scene.frame_set(frame)
+                for item, attr in scene_samples[frame]:
+                    setattr(item, attr, read_transforms(item.target))
+            scene.frame_set(self.frame)
+
+    def get_key(self, context):
+        """Identify the frame, selection, keys and settings a session was captured for"""
+        targets = tuple(target.as_pointer() for owner, group in get_tween_candidates(context) for target in group)
+        return context.scene.frame_current, type(self), self.use_fcurves, _key_index_generation, targets
+
+    def sample_fcurves(self, target, action, prev_frame, next_frame):
+        """Get the target's poses at both neighbouring frames from its action"""
+        return (sample_transforms_from_fcurves(target, action, prev_frame),
+                sample_transforms_from_fcurves(target, action, next_frame))
+
+    def matches(self, context):
+        """Check if the session is still valid for the current frame, selection and keys"""
+        return self.key == self.get_key(context)
+
+    def blend(self, blend_factor):
+        """Write blended transforms to every target without keying"""
+        for item in self.targets:
+            set_blended_transforms(item.target, item.prev_transforms, item.next_transforms, blend_factor)
+
+    def commit(self):
+        """Key the blended transforms of every target at the session frame"""
+        writer = KeyframeWriter()
+        for row, item in enumerate(self.targets):
+            action = item.owner.animation_data.action
+            writer.add_transforms(item.target, action, self.frame, self.get_blended_transforms(row))
+        writer.flush()
+
+        for item in self.targets:
+            mark_own_key_write(item.owner.animation_data.action, self.frame, item.bone_name)
+
+    def get_blended_transforms(self, row):
+        """Last blended transforms of a target, or None to read them from the target"""
+        return None
+
+    def restore(self):
+        """Put every target back to its transforms from before the session"""
+        for item in self.targets:
+            set_transforms(item.target, item.original_transforms)
+
+
+def write_pose_channel(bones, data_path, size, pose_rows, values):
+    """Write one channel of some pose bones with a single foreach_get/foreach_set pair"""
+    if not len(pose_rows):
+        return
+    buffer = np.empty(len(bones) * size)
+    bones.foreach_get(data_path, buffer)
+    buffer = buffer.reshape(-1, size)
+    buffer[pose_rows] = values
+    bones.foreach_set(data_path, buffer.ravel())
+
+
+class BatchedTweenSession(TweenSession):
+    """Tween session that blends all targets at once with NumPy and writes pose bones in bulk"""
+
+    def __init__(self, context, use_fcurves=True):
+        super().__init__(context, use_fcurves)
+
+        # Contiguous prev/next arrays, one row per target
+        prev_transforms = [item.prev_transforms for item in self.targets]
+        next_transforms = [item.next_transforms for item in self.targets]
+        self.is_euler = np.array([item.target.rotation_mode == 'XYZ' for item in self.targets], dtype=bool)
+        self.prev_loc, self.prev_euler, self.prev_quat, self.prev_scale = self.pack(prev_transforms)
+        self.next_loc, self.next_euler, self.next_quat, self.next_scale = self.pack(next_transforms)
+
+        # Pose bone rows grouped per armature for foreach_set writes
+        self.bone_groups = []
+        self.object_rows = []
+        groups = {}
+        for row, item in enumerate(self.targets):
+            if item.bone_name is None:
+                self.object_rows.append(row)
+            else:
+                groups.setdefault(item.owner.as_pointer(), (item.owner, []))[1].append(row)
+
+        for armature, rows in groups.values():
+            bones = armature.pose.bones
+            bone_indices = {bone.name: index for index, bone in enumerate(bones)}
+            rows = np.array(rows)
+            pose_rows = np.array([bone_indices[self.targets[row].bone_name] for row in rows])
+            euler = self.is_euler[rows]
+            self.bone_groups.append((armature, rows, pose_rows, euler))
+
+        self.last_blend = None
+
+    def pack(self, transforms):
+        """Pack (loc, rot, scale) tuples into location, euler, quaternion and scale arrays"""
+        count = len(transforms)
+        loc = np.array([t[0] for t in transforms], dtype=np.float64).reshape(count, 3)
+        scale = np.array([t[2] for t in transforms], dtype=np.float64).reshape(count, 3)
+
+        # Rows of the other rotation type keep a neutral placeholder
+        euler = np.zeros((count, 3))
+        quat = np.tile((1.0, 0.0, 0.0, 0.0), (count, 1))
+        for row, t in enumerate(transforms):
+            if self.is_euler[row]:
+                euler[row] = t[1]
+            else:
+                quat[row] = t[1]
+        return loc, euler, quat, scale
+
+    def sample_fcurves(self, target, action, prev_frame, next_frame):
+        return sample_transforms_from_keys(target, action, (prev_frame, next_frame))
+
+    def get_blended_transforms(self, row):
+        if self.last_blend is None:
+            return None
+        loc, euler, quat, scale = self.last_blend
+        rot = euler[row] if self.is_euler[row] else quat[row]
+        return loc[row], rot, scale[row]
+
+    def blend(self, blend_factor):
+        """Blend every target in one shot and write the results back in bulk"""
+        if not self.targets:
+            return
+
+        loc = lerp_arrays(self.prev_loc, self.next_loc, blend_factor)
+        euler = lerp_arrays(self.prev_euler, self.next_euler, blend_factor)
+        quat = slerp_quaternion_arrays(self.prev_quat, self.next_quat, blend_factor)
+        scale = lerp_arrays(self.prev_scale, self.next_scale, blend_factor)
+        self.last_blend = loc, euler, quat, scale
+
+        for armature, rows, pose_rows, euler_mask in self.bone_groups:
+            bones = armature.pose.bones
+            write_pose_channel(bones, "location", 3, pose_rows, loc[rows])
+            write_pose_channel(bones, "rotation_euler", 3, pose_rows[euler_mask], euler[rows[euler_mask]])
+            write_pose_channel(bones, "rotation_quaternion", 4, pose_rows[~euler_mask], quat[rows[~euler_mask]])
+            write_pose_channel(bones, "scale", 3, pose_rows, scale[rows])
+            # foreach_set skips RNA updates, so tag the pose for re-evaluation
+            armature.update_tag()
+
+        for row in self.object_rows:
+            obj = self.targets[row].target
+            obj.location = loc[row]
+            if self.is_euler[row]:
+                obj.rotation_euler = euler[row]
+            else:
+                obj.rotation_quaternion = quat[row]
+            obj.scale = scale[row]
+
+
+def create_tween_session(context, use_fcurves=True, use_batched_blend=True):
+    """Capture a batched or per-target tween session"""
+    if use_batched_blend:
+        return BatchedTweenSession(context, use_fcurves)
+    return TweenSession(context, use_fcurves)
@@ -1,7 +1,18 @@
+import time
 import bpy
+import numpy as np
+from bpy.app.handlers import persistent
 from bpy.types import Panel, Operator, PropertyGroup
-from bpy.props import FloatProperty
-from mathutils import Vector, Quaternion
+from bpy.props import FloatProperty, BoolProperty, EnumProperty, PointerProperty
+
+# Shared blend math (tween_core.py next to this add-on)
+from tween_core import lerp_arrays, slerp_quaternion_arrays, ease_in_out, gap_positions
+
+# Shared key index, sampling and tween sessions (tween_engine.py next to this add-on)
+import tween_engine
+from tween_engine import (
+    get_action_key_index, mark_own_key_write, KeyframeWriter, BatchedTweenSession,
+)
 
 # Addon information
 bl_info = {
@@ -14,166 +25,296 @@ bl_info = {
     "category": "Animation",
 }
 
-def get_keyframes_around_current(obj, current_frame):
-    """Find the previous and next keyframes around current frame"""
-    prev_frame = None
-    next_frame = None
-    
-    if not obj.animation_data or not obj.animation_data.action:
-        return None, None
-    
-    # Get all keyframe points
-    keyframes = []
-    for fcurve in obj.animation_data.action.fcurves:
-        for keyframe in fcurve.keyframe_points:
-            frame = int(keyframe.co[0])
-            if frame not in keyframes:
-                keyframes.append(frame)
-    
-    keyframes.sort()
-    
-    # Find prev and next keyframes
-    for frame in keyframes:
-        if frame < current_frame:
-            prev_frame = frame
-        elif frame > current_frame:
-            next_frame = frame
-            break
-    
-    return prev_frame, next_frame
+BLEND_CURVES = [
+    ('LINEAR', "Linear", "Constant speed from the previous to the next key"),
+    ('EASE', "Ease In/Out", "Slow out of the previous key and into the next key"),
+    ('CUSTOM', "Custom F-Curve", "Shape of the first F-curve of the chosen action, "
+                                 "its key range mapped to the gap between the keys"),
+]
+
+def get_blend_curve(settings):
+    """Function mapping gap positions (0-1 array) to blend factors, or None if unusable"""
+    if settings.range_blend_curve == 'LINEAR':
+        return lambda position: position
+    
+    if settings.range_blend_curve == 'EASE':
+        return ease_in_out
+    
+    action = settings.range_curve_action
+    if not action or not action.fcurves:
+        return None
+    fcurve = action.fcurves[0]
+    start, end = fcurve.range()
+    if end <= start:
+        return None
+    return lambda position: np.array([fcurve.evaluate(start + (end - start) * p) for p in position])
+
+def bake_tween_range(session, blend_curve):
+    """Key every frame between each target's surrounding keys in one batched blend
+
+    Returns the number of distinct frames keyed.
+    """
+    rows = []
+    frames = []
+    positions = []
+    for row, item in enumerate(session.targets):
+        gap, position = gap_positions(item.prev_frame, item.next_frame)
+        # The neighbours skip a key on the current frame - leave it as it is
+        key_index = get_action_key_index(item.owner.animation_data.action)
+        key_frames = key_index.frames if item.bone_name is None else key_index.get_bone_frames(item.bone_name)
+        keep = ~np.isin(gap, key_frames)
+        gap = gap[keep]
+        position = position[keep]
+        rows.append(np.full(len(gap), row))
+        frames.append(gap)
+        positions.append(position)
+    
+    if not rows:
+        return 0
+    rows = np.concatenate(rows)
+    frames = np.concatenate(frames)
+    if not len(frames):
+        return 0
+    blend_factor = np.asarray(blend_curve(np.concatenate(positions)), dtype=np.float64)
+    
+    # One evaluation of the tween math for every target and frame together
+    loc = lerp_arrays(session.prev_loc[rows], session.next_loc[rows], blend_factor[:, None])
+    euler = lerp_arrays(session.prev_euler[rows], session.next_euler[rows], blend_factor[:, None])
+    quat = slerp_quaternion_arrays(session.prev_quat[rows], session.next_quat[rows], blend_factor)
+    scale = lerp_arrays(session.prev_scale[rows], session.next_scale[rows], blend_factor[:, None])
+    
+    writer = KeyframeWriter()
+    for row, item in enumerate(session.targets):
+        mask = rows == row
+        rot = euler[mask] if session.is_euler[row] else quat[mask]
+        action = item.owner.animation_data.action
+        writer.add_transform_frames(item.target, action, frames[mask], loc[mask], rot, scale[mask])
+    writer.flush()
+    
+    for row, item in enumerate(session.targets):
+        action = item.owner.animation_data.action
+        for frame in frames[rows == row]:
+            mark_own_key_write(action, int(frame), item.bone_name)
+        # Re-evaluate the owner's animation so the current frame shows the new keys
+        item.owner.update_tag(refresh={'TIME'})
+    
+    return len(np.unique(frames))
+
+def create_tween_session(context):
+    """Capture a tween session of the type chosen in the tween settings"""
+    settings = context.scene.auto_tween_settings
+    return tween_engine.create_tween_session(context, settings.use_fcurve_evaluation, settings.use_batched_blend)
+
+# Session reused by slider updates while frame and selection stay the same
+_slider_session = None
+
+def get_slider_session(context):
+    """Get the cached slider session, capturing a new one when it went stale"""
+    global _slider_session
+    if _slider_session is None or not _slider_session.matches(context):
+        # Key the open interaction before its session is replaced
+        finish_slider_interaction()
+        _slider_session = create_tween_session(context)
+    return _slider_session
+
+# Seconds without slider updates that end a slider interaction
+SLIDER_IDLE_TIME = 0.3
+
+class SliderInteraction:
+    """Slider updates on one session, pushed to undo once when they stop"""
+    
+    def __init__(self, session, keyed):
+        self.session = session
+        # Without coalescing every update already keyed the session
+        self.keyed = keyed
+        self.updates = 0
+        self.last_update = time.monotonic()
+
+# Open slider interaction, finished by a timer once the slider goes idle
+_slider_interaction = None
+
+# Key writes skipped by coalescing, for the last interaction and the whole Blender session
+undo_stats = {
+    "last_updates": 0,
+    "last_writes_saved": 0,
+    "total_interactions": 0,
+    "total_writes_saved": 0,
+}
+
+def finish_slider_interaction(push_undo=True):
+    """Key the open slider interaction and record it as a single undo step"""
+    global _slider_interaction
+    interaction = _slider_interaction
+    _slider_interaction = None
+    if interaction is None or not interaction.session.targets:
+        return
+    
+    session = interaction.session
+    if not interaction.keyed:
+        session.commit()
+        
+        # Every update but the last would have keyed each target
+        writes_saved = max(interaction.updates - 1, 0) * len(session.targets)
+        undo_stats["last_updates"] = interaction.updates
+        undo_stats["last_writes_saved"] = writes_saved
+        undo_stats["total_interactions"] += 1
+        undo_stats["total_writes_saved"] += writes_saved
+    
+    # The sliders live on the window manager, so Blender pushes no undo step for them
+    if push_undo:
+        try:
+            bpy.ops.ed.undo_push(message="Tween")
+        except RuntimeError as error:
+            print(f"Auto Tween Machine: could not push undo step ({error})")
+
+def check_slider_interaction():
+    """Timer callback that finishes the slider interaction once updates stop"""
+    if _slider_interaction is None:
+        return None
+    
+    idle = time.monotonic() - _slider_interaction.last_update
+    if idle < SLIDER_IDLE_TIME:
+        return SLIDER_IDLE_TIME - idle
+    
+    finish_slider_interaction()
+    return None
 
-def interpolate_object_transforms(obj, prev_frame, next_frame, current_frame, blend_factor):
-    """Interpolate object transforms between two keyframes"""
-    scene = bpy.context.scene
-    
-    # Store current frame
-    original_frame = scene.frame_current
-    
-    # Get transform at previous keyframe
-    scene.frame_set(prev_frame)
-    prev_loc = obj.location.copy()
-    prev_rot = obj.rotation_euler.copy() if obj.rotation_mode == 'XYZ' else obj.rotation_quaternion.copy()
-    prev_scale = obj.scale.copy()
-    
-    # Get transform at next keyframe
-    scene.frame_set(next_frame)
-    next_loc = obj.location.copy()
-    next_rot = obj.rotation_euler.copy() if obj.rotation_mode == 'XYZ' else obj.rotation_quaternion.copy()
-    next_scale = obj.scale.copy()
-    
-    # Go back to current frame
-    scene.frame_set(current_frame)
-    
-    # Interpolate location
-    new_loc = prev_loc.lerp(next_loc, blend_factor)
-    obj.location = new_loc
-    
-    # Interpolate rotation
-    if obj.rotation_mode == 'XYZ':
-        # Euler rotation
-        new_rot = Vector((
-            prev_rot[0] + (next_rot[0] - prev_rot[0]) * blend_factor,
-            prev_rot[1] + (next_rot[1] - prev_rot[1]) * blend_factor,
-            prev_rot[2] + (next_rot[2] - prev_rot[2]) * blend_factor
-        ))
-        obj.rotation_euler = new_rot
-    else:
-        # Quaternion rotation
-        prev_quat = Quaternion(prev_rot)
-        next_quat = Quaternion(next_rot)
-        new_rot = prev_quat.slerp(next_quat, blend_factor)
-        obj.rotation_quaternion = new_rot
-    
-    # Interpolate scale
-    new_scale = prev_scale.lerp(next_scale, blend_factor)
-    obj.scale = new_scale
-    
-    # Insert keyframes
-    obj.keyframe_insert(data_path="location")
-    obj.keyframe_insert(data_path="rotation_euler" if obj.rotation_mode == 'XYZ' else "rotation_quaternion")
-    obj.keyframe_insert(data_path="scale")
+@persistent
+def clear_slider_state(*args):
+    """Drop the slider session and interaction when a file is loaded or undo/redo replaces the data"""
+    global _slider_session, _slider_interaction
+    _slider_session = None
+    _slider_interaction = None
 
-def interpolate_bone_transforms(bone, armature, prev_frame, next_frame, current_frame, blend_factor):
-    """Interpolate bone transforms between two keyframes"""
-    scene = bpy.context.scene
-    
-    # Store current frame
-    original_frame = scene.frame_current
-    
-    # Get pose at previous keyframe
-    scene.frame_set(prev_frame)
-    prev_loc = bone.location.copy()
-    prev_rot = bone.rotation_euler.copy() if bone.rotation_mode == 'XYZ' else bone.rotation_quaternion.copy()
-    prev_scale = bone.scale.copy()
-    
-    # Get pose at next keyframe
-    scene.frame_set(next_frame)
-    next_loc = bone.location.copy()
-    next_rot = bone.rotation_euler.copy() if bone.rotation_mode == 'XYZ' else bone.rotation_quaternion.copy()
-    next_scale = bone.scale.copy()
-    
-    # Go back to current frame
-    scene.frame_set(current_frame)
-    
-    # Interpolate transforms
-    bone.location = prev_loc.lerp(next_loc, blend_factor)
-    
-    if bone.rotation_mode == 'XYZ':
-        new_rot = Vector((
-            prev_rot[0] + (next_rot[0] - prev_rot[0]) * blend_factor,
-            prev_rot[1] + (next_rot[1] - prev_rot[1]) * blend_factor,
-            prev_rot[2] + (next_rot[2] - prev_rot[2]) * blend_factor
-        ))
-        bone.rotation_euler = new_rot
-    else:
-        prev_quat = Quaternion(prev_rot)
-        next_quat = Quaternion(next_rot)
-        bone.rotation_quaternion = prev_quat.slerp(next_quat, blend_factor)
-    
-    bone.scale = prev_scale.lerp(next_scale, blend_factor)
-    
-    # Insert keyframes
-    bone.keyframe_insert(data_path="location")
-    bone.keyframe_insert(data_path="rotation_euler" if bone.rotation_mode == 'XYZ' else "rotation_quaternion")
-    bone.keyframe_insert(data_path="scale")
+@persistent
+def finish_slider_interaction_on_frame_change(scene, *args):
+    """Key a pending slider interaction before the frame change overwrites it"""
+    if _slider_interaction is not None:
+        finish_slider_interaction()
 
 def apply_tween(blend_factor):
     """Apply tween with given blend factor"""
+    global _slider_interaction
     context = bpy.context
-    scene = context.scene
-    current_frame = scene.frame_current
-    
-    tweened_count = 0
+    coalesce = context.scene.auto_tween_settings.use_undo_coalescing
+    
+    # A new frame or selection starts a new interaction
+    if _slider_interaction is not None and not _slider_interaction.session.matches(context):
+        finish_slider_interaction()
+    
+    session = get_slider_session(context)
+    if _slider_interaction is None:
+        _slider_interaction = SliderInteraction(session, keyed=not coalesce)
+        bpy.app.timers.register(check_slider_interaction, first_interval=SLIDER_IDLE_TIME)
+    
+    # When coalescing, only blend while the slider moves; keys are written when it stops
+    session.blend(blend_factor)
+    if _slider_interaction.keyed:
+        session.commit()
+    _slider_interaction.updates += 1
+    _slider_interaction.last_update = time.monotonic()
+    return len(session.targets)
+
+class TWEEN_OT_range(Operator):
+    """Key every frame between the keys surrounding the current frame, following a blend curve"""
+    bl_idname = "anim.tween_range"
+    bl_label = "Tween Range"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def execute(self, context):
+        blend_curve = get_blend_curve(context.scene.auto_tween_settings)
+        if blend_curve is None:
+            self.report({'ERROR'}, "Custom blend curve needs an action with a keyed F-curve")
+            return {'CANCELLED'}
+        
+        session = BatchedTweenSession(context, context.scene.auto_tween_settings.use_fcurve_evaluation)
+        if not session.targets:
+            self.report({'WARNING'}, "Nothing to tween between keyframes")
+            return {'CANCELLED'}
+        
+        count = bake_tween_range(session, blend_curve)
+        if not count:
+            self.report({'WARNING'}, "No unkeyed frames between the surrounding keyframes")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Tweened {count} frames on {len(session.targets)} targets")
+        return {'FINISHED'}
+
+class TWEEN_OT_drag(Operator):
+    """Drag the mouse to blend selected objects or bones between their surrounding keyframes"""
+    bl_idname = "anim.tween_drag"
+    bl_label = "Drag Tween"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    # Mouse travel in pixels for a blend factor change of 1.0
+    drag_pixels = 400
+    
+    blend_factor: FloatProperty(
+        name="Blend",
+        description="Blend between previous (0) and next (1) keyframe",
+        default=0.5,
+        soft_min=-1.0,
+        soft_max=2.0,
+        precision=2
+    )
     
-    # Check if we're in pose mode
-    if context.mode == 'POSE' and context.selected_pose_bones:
-        # POSE MODE - Tween selected bones
-        armature = context.active_object
-        selected_bones = context.selected_pose_bones
+    def execute(self, context):
+        session = create_tween_session(context)
+        if not session.targets:
+            self.report({'WARNING'}, "Nothing to tween between keyframes")
+            return {'CANCELLED'}
+        
+        session.blend(self.blend_factor)
+        session.commit()
+        return {'FINISHED'}
+    
+    def invoke(self, context, event):
+        # Capture all neighbouring poses once; dragging only blends
+        self.session = create_tween_session(context)
+        if not self.session.targets:
+            self.report({'WARNING'}, "Nothing to tween between keyframes")
+            return {'CANCELLED'}
+        
+        self.start_mouse_x = event.mouse_x
+        self.start_factor = self.blend_factor
+        self.session.blend(self.blend_factor)
+        self.update_header(context)
         
-        for bone in selected_bones:
-            prev_frame, next_frame = get_keyframes_around_current(armature, current_frame)
-            
-            if prev_frame is not None and next_frame is not None:
-                interpolate_bone_transforms(bone, armature, prev_frame, next_frame, current_frame, blend_factor)
-                tweened_count += 1
-    
-    else:
-        # OBJECT MODE - Tween selected objects
-        selected_objects = context.selected_objects
+        context.window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'MOUSEMOVE':
+            pixels = self.drag_pixels * context.preferences.system.ui_scale
+            factor = self.start_factor + (event.mouse_x - self.start_mouse_x) / pixels
+            self.blend_factor = min(max(factor, -1.0), 2.0)
+            self.session.blend(self.blend_factor)
+            self.update_header(context)
         
-        if selected_objects:
-            for obj in selected_objects:
-                prev_frame, next_frame = get_keyframes_around_current(obj, current_frame)
-                
-                if prev_frame is not None and next_frame is not None:
-                    interpolate_object_transforms(obj, prev_frame, next_frame, current_frame, blend_factor)
-                    tweened_count += 1
-    
-    return tweened_count
+        elif event.type in {'LEFTMOUSE', 'RET', 'NUMPAD_ENTER'} and event.value == 'RELEASE':
+            # Keys are written once, on release
+            self.session.commit()
+            self.finish(context)
+            return {'FINISHED'}
+        
+        elif event.type in {'RIGHTMOUSE', 'ESC'}:
+            self.session.restore()
+            self.finish(context)
+            return {'CANCELLED'}
+        
+        return {'RUNNING_MODAL'}
+    
+    def update_header(self, context):
+        if context.area:
+            context.area.header_text_set(f"Tween: {self.blend_factor:.2f}")
+    
+    def finish(self, context):
+        if context.area:
+            context.area.header_text_set(None)
+        self.session = None
 
-# Properties for tween settings with auto-update
-class TweenSettings(PropertyGroup):
+# Tween sliders with auto-update, on the window manager so Blender
+# pushes no undo step per edit (the tween pushes its own)
+class TweenSliders(PropertyGroup):
     def update_tween_left(self, context):
         """Auto-apply tween towards previous keyframe"""
         apply_tween(self.tween_left_factor)
@@ -234,6 +375,40 @@ class TweenSettings(PropertyGroup):
         update=update_overshoot_right
     )
 
+# Properties for tween settings
+class AutoTweenSettings(PropertyGroup):
+    use_fcurve_evaluation: BoolProperty(
+        name="Read F-Curves",
+        description="Read neighbouring keys straight from the action's F-curves instead of "
+                    "changing frames (constrained, driven or NLA-blended targets still change frames)",
+        default=True
+    )
+    
+    range_blend_curve: EnumProperty(
+        name="Blend Curve",
+        description="How Tween Range spreads the blend over the frames between keys",
+        items=BLEND_CURVES,
+        default='LINEAR'
+    )
+    
+    range_curve_action: PointerProperty(
+        name="Curve Action",
+        description="Action whose first F-curve shapes the custom blend (values 0-1)",
+        type=bpy.types.Action
+    )
+    
+    use_undo_coalescing: BoolProperty(
+        name="Coalesce Keys",
+        description="Key slider tweens once when the slider stops instead of on every update",
+        default=True
+    )
+    
+    use_batched_blend: BoolProperty(
+        name="Batched Blend",
+        description="Blend all selected targets at once with NumPy and write pose bones in bulk",
+        default=True
+    )
+
 # UI Panel
 class TWEEN_PT_panel(Panel):
     bl_label = "Auto Tween Machine"
@@ -245,23 +420,49 @@ class TWEEN_PT_panel(Panel):
     def draw(self, context):
         layout = self.layout
         scene = context.scene
-        tween_settings = scene.tween_settings
+        tween_settings = scene.auto_tween_settings
+        tween_sliders = context.window_manager.tween_sliders
         
         # Tween sliders in one row
         layout.label(text="Tween:")
         row = layout.row()
-        row.prop(tween_settings, "tween_left_factor", slider=True)
-        row.prop(tween_settings, "tween_right_factor", slider=True)
+        row.prop(tween_sliders, "tween_left_factor", slider=True)
+        row.prop(tween_sliders, "tween_right_factor", slider=True)
         
         # Overshoot sliders in one row
         layout.label(text="Overshoot:")
         row = layout.row()
-        row.prop(tween_settings, "overshoot_left_factor", slider=True)
-        row.prop(tween_settings, "overshoot_right_factor", slider=True)
+        row.prop(tween_sliders, "overshoot_left_factor", slider=True)
+        row.prop(tween_sliders, "overshoot_right_factor", slider=True)
+        
+        layout.operator("anim.tween_drag", icon='MOUSE_MOVE')
+        
+        # Breakdown baking over the whole gap between keys
+        layout.label(text="Range:")
+        row = layout.row(align=True)
+        row.prop(tween_settings, "range_blend_curve", text="")
+        row.operator("anim.tween_range", icon='IPO_EASE_IN_OUT')
+        if tween_settings.range_blend_curve == 'CUSTOM':
+            layout.prop(tween_settings, "range_curve_action", text="")
+        
+        row = layout.row()
+        row.prop(tween_settings, "use_fcurve_evaluation")
+        row.prop(tween_settings, "use_batched_blend")
+        layout.prop(tween_settings, "use_undo_coalescing")
+        
+        # Key writes skipped by coalescing slider updates
+        if tween_settings.use_undo_coalescing and undo_stats["total_interactions"]:
+            col = layout.column(align=True)
+            col.label(text=f"Last drag: {undo_stats['last_updates']} updates keyed once")
+            col.label(text=f"Target keys not rewritten: {undo_stats['last_writes_saved']} "
+                           f"(session {undo_stats['total_writes_saved']})")
 
 # Registration
 classes = [
-    TweenSettings,
+    TweenSliders,
+    AutoTweenSettings,
+    TWEEN_OT_drag,
+    TWEEN_OT_range,
     TWEEN_PT_panel,
 ]
 
@@ -270,16 +471,40 @@ def register():
         bpy.utils.register_class(cls)
     
     # Add properties to scene
-    bpy.types.Scene.tween_settings = bpy.props.PointerProperty(type=TweenSettings)
+    bpy.types.Scene.auto_tween_settings = bpy.props.PointerProperty(type=AutoTweenSettings)
+    bpy.types.WindowManager.tween_sliders = bpy.props.PointerProperty(type=TweenSliders)
+    
+    # Keep cached keyframe indices in sync with key edits
+    tween_engine.register_handlers(__name__)
+    bpy.app.handlers.load_post.append(clear_slider_state)
+    # Undo and redo free the session's targets
+    bpy.app.handlers.undo_post.append(clear_slider_state)
+    bpy.app.handlers.redo_post.append(clear_slider_state)
+    bpy.app.handlers.frame_change_pre.append(finish_slider_interaction_on_frame_change)
     
     print("Auto Tween Machine addon registered")
 
 def unregister():
+    if clear_slider_state in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(clear_slider_state)
+    if clear_slider_state in bpy.app.handlers.undo_post:
+        bpy.app.handlers.undo_post.remove(clear_slider_state)
+    if clear_slider_state in bpy.app.handlers.redo_post:
+        bpy.app.handlers.redo_post.remove(clear_slider_state)
+    if finish_slider_interaction_on_frame_change in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.remove(finish_slider_interaction_on_frame_change)
+    if bpy.app.timers.is_registered(check_slider_interaction):
+        bpy.app.timers.unregister(check_slider_interaction)
+    finish_slider_interaction(push_undo=False)
+    clear_slider_state()
+    tween_engine.unregister_handlers(__name__)
+    
     for cls in classes:
         bpy.utils.unregister_class(cls)
     
     # Remove properties from scene
-    del bpy.types.Scene.tween_settings
+    del bpy.types.Scene.auto_tween_settings
+    del bpy.types.WindowManager.tween_sliders
     
     print("Auto Tween Machine addon unregistered")
 